@@ -0,0 +1,30 @@
+"""refresh token families
+
+Revision ID: 0002_refresh_token_families
+Revises: 0001_initial
+Create Date: 2026-10-16 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_refresh_token_families"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("refresh_tokens", sa.Column("family_id", postgresql.UUID(as_uuid=True)))
+    # Existing tokens each start their own family.
+    op.execute("UPDATE refresh_tokens SET family_id = id")
+    op.alter_column("refresh_tokens", "family_id", nullable=False)
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_family_id", table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "family_id")
@@ -0,0 +1,27 @@
+"""users session generation
+
+Revision ID: 0003_session_generation
+Revises: 0002_refresh_token_families
+Create Date: 2026-10-16 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_session_generation"
+down_revision = "0002_refresh_token_families"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("session_generation", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "session_generation")
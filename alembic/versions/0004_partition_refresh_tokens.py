@@ -0,0 +1,100 @@
+"""range-partition refresh_tokens by expires_at
+
+Revision ID: 0004_partition_refresh_tokens
+Revises: 0003_session_generation
+Create Date: 2026-10-16 13:00:00.000000
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_partition_refresh_tokens"
+down_revision = "0003_session_generation"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, user_id, family_id, token_jti, expires_at, revoked_at, created_at"
+MONTHS_AHEAD = 3
+
+
+def _month_start(offset: int) -> datetime:
+    now = datetime.now(timezone.utc)
+    month = now.year * 12 + now.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _columns() -> list:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("family_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("token_jti", sa.String(length=64), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+
+
+def upgrade() -> None:
+    # Unique constraints on a partitioned table must include the partition
+    # key, so the primary key and the jti constraint gain expires_at. Rows that
+    # expired before the first monthly partition land in the default one and
+    # are purged by the partition job every app process runs; that job also
+    # creates the months after these.
+    op.create_table(
+        "refresh_tokens_partitioned",
+        *_columns(),
+        postgresql_partition_by="RANGE (expires_at)",
+    )
+    for offset in range(MONTHS_AHEAD + 1):
+        start, end = _month_start(offset), _month_start(offset + 1)
+        op.execute(
+            f"CREATE TABLE refresh_tokens_p{start:%Y%m} PARTITION OF refresh_tokens_partitioned "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute("CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens_partitioned DEFAULT")
+
+    op.execute(
+        f"INSERT INTO refresh_tokens_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM refresh_tokens"
+    )
+    op.drop_table("refresh_tokens")
+    op.rename_table("refresh_tokens_partitioned", "refresh_tokens")
+
+    op.create_primary_key("refresh_tokens_pkey", "refresh_tokens", ["id", "expires_at"])
+    op.create_unique_constraint(
+        "refresh_tokens_token_jti_key", "refresh_tokens", ["token_jti", "expires_at"]
+    )
+    op.create_foreign_key(
+        "refresh_tokens_user_id_fkey",
+        "refresh_tokens",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at", "id"])
+
+
+def downgrade() -> None:
+    op.create_table("refresh_tokens_plain", *_columns())
+    op.execute(f"INSERT INTO refresh_tokens_plain ({COLUMNS}) SELECT {COLUMNS} FROM refresh_tokens")
+    op.drop_table("refresh_tokens")
+    op.rename_table("refresh_tokens_plain", "refresh_tokens")
+
+    op.create_primary_key("refresh_tokens_pkey", "refresh_tokens", ["id"])
+    op.create_unique_constraint("refresh_tokens_token_jti_key", "refresh_tokens", ["token_jti"])
+    op.create_foreign_key(
+        "refresh_tokens_user_id_fkey",
+        "refresh_tokens",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
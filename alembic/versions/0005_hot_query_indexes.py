@@ -0,0 +1,56 @@
+"""indexes for hot auth queries and cascades
+
+Revision ID: 0005_hot_query_indexes
+Revises: 0004_partition_refresh_tokens
+Create Date: 2026-10-16 15:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_hot_query_indexes"
+down_revision = "0004_partition_refresh_tokens"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ON DELETE CASCADE from users looks rows up by user_id.
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+    op.create_index(
+        "ix_email_verification_tokens_user_id", "email_verification_tokens", ["user_id"]
+    )
+    op.create_index("ix_password_reset_tokens_user_id", "password_reset_tokens", ["user_id"])
+
+    # Family revocation only touches live rows and returns their jti.
+    op.drop_index("ix_refresh_tokens_family_id", table_name="refresh_tokens")
+    op.create_index(
+        "ix_refresh_tokens_family_id_active",
+        "refresh_tokens",
+        ["family_id"],
+        postgresql_include=["token_jti"],
+        postgresql_where=sa.text("revoked_at IS NULL"),
+    )
+
+    # Reaper keysets: (column, id) makes each batch an index-only range scan.
+    for table in ("email_verification_tokens", "password_reset_tokens"):
+        op.create_index(f"ix_{table}_expires_at", table, ["expires_at", "id"])
+        op.create_index(
+            f"ix_{table}_used_at",
+            table,
+            ["used_at", "id"],
+            postgresql_where=sa.text("used_at IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    for table in ("email_verification_tokens", "password_reset_tokens"):
+        op.drop_index(f"ix_{table}_used_at", table_name=table)
+        op.drop_index(f"ix_{table}_expires_at", table_name=table)
+    op.drop_index("ix_refresh_tokens_family_id_active", table_name="refresh_tokens")
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+    op.drop_index("ix_password_reset_tokens_user_id", table_name="password_reset_tokens")
+    op.drop_index("ix_email_verification_tokens_user_id", table_name="email_verification_tokens")
+    op.drop_index("ix_refresh_tokens_user_id", table_name="refresh_tokens")
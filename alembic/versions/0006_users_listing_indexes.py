@@ -0,0 +1,36 @@
+"""indexes for admin user listing
+
+Revision ID: 0006_users_listing_indexes
+Revises: 0005_hot_query_indexes
+Create Date: 2026-10-16 17:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_users_listing_indexes"
+down_revision = "0005_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination needs a total order without NULLs.
+    op.execute("UPDATE users SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column("users", "created_at", nullable=False)
+    # Scanned backwards for ORDER BY created_at DESC, id DESC.
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    # The unique email index uses the default collation, which cannot serve LIKE 'prefix%'.
+    op.create_index(
+        "ix_users_email_pattern",
+        "users",
+        ["email"],
+        postgresql_ops={"email": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_pattern", table_name="users")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.alter_column("users", "created_at", nullable=True)
@@ -0,0 +1,50 @@
+"""domain events outbox
+
+Revision ID: 0008_domain_events
+Revises: 0007_email_outbox
+Create Date: 2026-10-16 21:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_domain_events"
+down_revision = "0007_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "domain_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("event_type", sa.String(length=64), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True)),
+        sa.Column("data", postgresql.JSONB(), nullable=False, server_default="{}"),
+        sa.Column("published_at", sa.DateTime(timezone=True)),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+    )
+    # The relay scans unpublished ids in order; the reaper purges published rows.
+    op.create_index(
+        "ix_domain_events_unpublished",
+        "domain_events",
+        ["id"],
+        postgresql_where=sa.text("published_at IS NULL"),
+    )
+    op.create_index(
+        "ix_domain_events_published_at",
+        "domain_events",
+        ["published_at", "id"],
+        postgresql_where=sa.text("published_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domain_events_published_at", table_name="domain_events")
+    op.drop_index("ix_domain_events_unpublished", table_name="domain_events")
+    op.drop_table("domain_events")
@@ -0,0 +1,31 @@
+"""role session generations
+
+Revision ID: 0009_role_generations
+Revises: 0008_domain_events
+Create Date: 2026-10-16 22:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_role_generations"
+down_revision = "0008_domain_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "role_generations",
+        sa.Column("role", sa.String(length=32), primary_key=True),
+        sa.Column("generation", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    # Generations bumped before this revision are still in Redis, which is
+    # read first; the next bump of each role continues past them.
+    op.bulk_insert(table, [{"role": role, "generation": 0} for role in ("user", "admin")])
+
+
+def downgrade() -> None:
+    op.drop_table("role_generations")
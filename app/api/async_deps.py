@@ -0,0 +1,60 @@
+from typing import Any, Dict
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import (
+    access_token_claims,
+    cached_copy_is_stale,
+    check_session,
+    oauth2_scheme,
+    replica_is_behind,
+)
+from app.db.models.user import User, UserRole
+from app.db.session import get_async_read_db, reads_from_replica, use_primary
+from app.schemas.user import CachedUser, UserPublic
+from app.services.sessions import get_session_generations_async, get_user_generation_async
+from app.services.user_cache import (
+    cache_user_async,
+    get_cached_user_async,
+    get_shared_user_async,
+)
+
+
+async def load_user(db: AsyncSession, user_id: str, payload: Dict[str, Any]) -> CachedUser:
+    db_user = await db.get(User, UUID(user_id))
+    if reads_from_replica(db):
+        generation = max(payload.get("gen", 0), await get_user_generation_async(user_id))
+        if replica_is_behind(db_user, generation):
+            use_primary(db)
+            db_user = await db.get(User, UUID(user_id), populate_existing=True)
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not active")
+    return await cache_user_async(db_user)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_read_db)
+) -> UserPublic:
+    payload = access_token_claims(token)
+    user_id = payload["sub"]
+    user = await get_cached_user_async(user_id)
+    if user is not None:
+        generations = await get_session_generations_async(db, user_id, user.role)
+        if not cached_copy_is_stale(user, generations[0]):
+            check_session(payload, user, *generations)
+            return user
+        user = await get_shared_user_async(user_id)
+        if user is not None and cached_copy_is_stale(user, generations[0]):
+            user = None
+    if user is None:
+        user = await load_user(db, user_id, payload)
+    check_session(payload, user, *await get_session_generations_async(db, user_id, user.role))
+    return user
+
+
+async def require_admin(user: UserPublic = Depends(get_current_user)) -> UserPublic:
+    if user.role != UserRole.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user
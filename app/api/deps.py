@@ -1,29 +1,96 @@
+from typing import Any, Dict
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core.security import decode_token
-from app.db.session import get_db
+from app.db.session import get_read_db, reads_from_replica, use_primary
 from app.db.models.user import User, UserRole
+from app.schemas.user import CachedUser, UserPublic
+from app.services.sessions import get_session_generations, get_user_generation
+from app.services.user_cache import cache_user, get_cached_user, get_shared_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    payload = decode_token(token)
+def access_token_claims(token: str) -> Dict[str, Any]:
+    try:
+        payload = decode_token(token)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token"
+        ) from exc
     if payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token")
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token")
+    return payload
+
 
-    user = db.get(User, user_id)
-    if not user or not user.is_active or not user.is_verified:
+def check_session(
+    payload: Dict[str, Any], user: CachedUser, generation: int, role_generation: int
+) -> None:
+    if not user.is_active or not user.is_verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not active")
+    # Redis holds the current generation; the user copy may be cached from
+    # before a bump, or Redis may have lost the key.
+    generation = max(generation, user.session_generation)
+    if payload.get("gen", 0) != generation or payload.get("rgen", 0) != role_generation:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked")
+
+
+def replica_is_behind(db_user: User | None, generation: int) -> bool:
+    # The replica has not applied a change that already committed: the user
+    # is new or newly verified, or their generation was bumped (logout-all,
+    # password reset, role or email change). Redis mirrors the generation.
+    if db_user is None or not db_user.is_active or not db_user.is_verified:
+        return True
+    return db_user.session_generation < generation
+
+
+def cached_copy_is_stale(user: CachedUser, generation: int) -> bool:
+    # Other workers only delete their own copies. Every change to role or
+    # status bumps the generation, so an older copy is reloaded; an inactive
+    # copy is reloaded too, as it may predate verification.
+    return user.session_generation < generation or not (user.is_active and user.is_verified)
+
+
+def load_user(db: Session, user_id: str, payload: Dict[str, Any]) -> CachedUser:
+    db_user = db.get(User, UUID(user_id))
+    if reads_from_replica(db):
+        generation = max(payload.get("gen", 0), get_user_generation(user_id))
+        if replica_is_behind(db_user, generation):
+            use_primary(db)
+            db_user = db.get(User, UUID(user_id), populate_existing=True)
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not active")
+    return cache_user(db_user)
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)
+) -> UserPublic:
+    payload = access_token_claims(token)
+    user_id = payload["sub"]
+    user = get_cached_user(user_id)
+    if user is not None:
+        generations = get_session_generations(db, user_id, user.role)
+        if not cached_copy_is_stale(user, generations[0]):
+            check_session(payload, user, *generations)
+            return user
+        # Another worker may already have cached the current copy in Redis.
+        user = get_shared_user(user_id)
+        if user is not None and cached_copy_is_stale(user, generations[0]):
+            user = None
+    if user is None:
+        user = load_user(db, user_id, payload)
+    check_session(payload, user, *get_session_generations(db, user_id, user.role))
     return user
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
+def require_admin(user: UserPublic = Depends(get_current_user)) -> UserPublic:
     if user.role != UserRole.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
     return user
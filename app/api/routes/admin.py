@@ -1,34 +1,145 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import io
+import json
+import tempfile
+from typing import Iterator, Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import require_admin
+from app.core.hashing import hash_executor
 from app.db.models.user import User, UserRole
-from app.db.session import get_db
-from app.schemas.user import UserPublic
+from app.db.pool import pool_stats
+from app.db.replicas import replicas
+from app.db.session import async_engine, engine, get_db, get_read_db
+from app.schemas.user import UserPage, UserPublic
+from app.services import admin_service, email_outbox, user_import
+from app.services.admin_service import UserFilters
+from app.services.sessions import bump_role_generation, bump_user_generation
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-@router.get("/users", response_model=list[UserPublic])
+@router.get("/users", response_model=UserPage)
 def list_users(
-    _: User = Depends(require_admin),
-    db: Session = Depends(get_db),
-) -> list[UserPublic]:
-    return list(db.scalars(select(User).order_by(User.created_at.desc())))
+    filters: UserFilters = Depends(),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    _: UserPublic = Depends(require_admin),
+    db: Session = Depends(get_read_db),
+) -> UserPage:
+    rows, next_cursor = admin_service.list_users_page(db, filters, limit, cursor)
+    return UserPage(
+        items=[UserPublic.model_validate(row) for row in rows], next_cursor=next_cursor
+    )
+
+
+@router.get("/users/export")
+def export_users(
+    filters: UserFilters = Depends(),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    _: UserPublic = Depends(require_admin),
+) -> StreamingResponse:
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        admin_service.export_users(filters, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+
+@router.post("/users/import")
+async def import_users(
+    request: Request,
+    import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    send_verification: bool = True,
+    _: UserPublic = Depends(require_admin),
+) -> StreamingResponse:
+    # The body is spooled to disk first so the import can run in the
+    # threadpool and stream progress back as NDJSON, one line per batch.
+    upload = tempfile.TemporaryFile()
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+
+    def progress() -> Iterator[str]:
+        with upload, io.TextIOWrapper(upload, encoding="utf-8", newline="") as stream:
+            for event in user_import.import_users(
+                stream, import_format, send_verification=send_verification
+            ):
+                yield json.dumps(event) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
 
 
 @router.patch("/users/{user_id}/role", response_model=UserPublic)
 def update_user_role(
     user_id: str,
     role: UserRole,
-    _: User = Depends(require_admin),
+    _: UserPublic = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> UserPublic:
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     user.role = role
-    db.commit()
+    # Sessions minted under the old role end with the change.
+    bump_user_generation(db, user.id)
     db.refresh(user)
     return user
+
+
+@router.post("/users/{user_id}/sessions/revoke")
+def revoke_user_sessions(
+    user_id: UUID,
+    _: UserPublic = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> dict:
+    generation = bump_user_generation(db, user_id)
+    if generation is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return {"session_generation": generation}
+
+
+@router.post("/roles/{role}/sessions/revoke")
+def revoke_role_sessions(
+    role: UserRole,
+    _: UserPublic = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> dict:
+    return {"role_generation": bump_role_generation(db, role)}
+
+
+@router.get("/stats/hashing")
+def hashing_stats(_: UserPublic = Depends(require_admin)) -> dict:
+    return hash_executor.stats()
+
+
+@router.get("/stats/email")
+def email_stats(
+    _: UserPublic = Depends(require_admin), db: Session = Depends(get_read_db)
+) -> dict:
+    return email_outbox.queue_stats(db)
+
+
+@router.get("/stats/replicas")
+def replica_stats(_: UserPublic = Depends(require_admin)) -> list:
+    return replicas.stats()
+
+
+@router.get("/stats/pool")
+def database_pool_stats(_: UserPublic = Depends(require_admin)) -> dict:
+    return {
+        "primary": pool_stats(engine),
+        "primary_async": pool_stats(async_engine.sync_engine),
+        "replicas": [pool_stats(replica) for replica in replicas.engines],
+    }
+
+
+@router.post("/email/dead-letters/retry")
+def retry_dead_letters(
+    _: UserPublic = Depends(require_admin), db: Session = Depends(get_db)
+) -> dict:
+    return {"requeued": email_outbox.requeue_dead(db)}
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.api.deps import get_current_user
 from app.core.config import settings
-from app.core.rate_limit import RateLimiter
-from app.db.session import get_db
+from app.core.rate_limit import RateLimit, RateLimiter
+from app.db.session import get_db, get_read_db
 from app.schemas.auth import (
     LoginIn,
     LogoutIn,
@@ -22,11 +23,18 @@ limiter = RateLimiter()
 
 
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register(payload: RegisterIn, request: Request, db: Session = Depends(get_db)) -> UserPublic:
+def register(
+    payload: RegisterIn, request: Request, response: Response, db: Session = Depends(get_db)
+) -> UserPublic:
     ip = request.client.host if request.client else "unknown"
-    limiter.hit(f"rl:register:ip:{ip}", settings.rate_limit_register, settings.rate_limit_window_seconds)
-    user = auth_service.register_user(db, payload.email, payload.password)
-    return user
+    rate_limit = limiter.hit(
+        f"rl:register:ip:{ip}",
+        settings.rate_limit_register,
+        settings.rate_limit_window_seconds,
+        response=response,
+    )
+    with rate_limit.headers_on_errors():
+        return auth_service.register_user(db, payload.email, payload.password)
 
 
 @router.post("/verify-email")
@@ -36,11 +44,22 @@ def verify_email(payload: VerifyEmailIn, db: Session = Depends(get_db)) -> dict:
 
 
 @router.post("/login", response_model=TokenPair)
-def login(payload: LoginIn, request: Request, db: Session = Depends(get_db)) -> TokenPair:
+def login(
+    payload: LoginIn, request: Request, response: Response, db: Session = Depends(get_read_db)
+) -> TokenPair:
     ip = request.client.host if request.client else "unknown"
-    limiter.hit(f"rl:login:ip:{ip}", settings.rate_limit_login, settings.rate_limit_window_seconds)
-    user = auth_service.authenticate_user(db, payload.email, payload.password)
-    access_token, refresh_token = auth_service.create_token_pair(db, user)
+    rate_limit = limiter.check(
+        RateLimit(f"rl:login:ip:{ip}", settings.rate_limit_login, settings.rate_limit_window_seconds),
+        RateLimit(
+            f"rl:login:email:{payload.email.lower()}",
+            settings.rate_limit_login_email,
+            settings.rate_limit_window_seconds,
+        ),
+        response=response,
+    )
+    with rate_limit.headers_on_errors():
+        user = auth_service.authenticate_user(db, payload.email, payload.password)
+        access_token, refresh_token = auth_service.create_token_pair(db, user)
     return TokenPair(access_token=access_token, refresh_token=refresh_token)
 
 
@@ -56,6 +75,12 @@ def logout(payload: LogoutIn, db: Session = Depends(get_db)) -> dict:
     return {"message": "Logged out"}
 
 
+@router.post("/logout-all")
+def logout_all(user: UserPublic = Depends(get_current_user), db: Session = Depends(get_db)) -> dict:
+    auth_service.logout_all(db, user.id)
+    return {"message": "Logged out of all sessions"}
+
+
 @router.post("/password-reset/request")
 def password_reset_request(payload: PasswordResetRequestIn, db: Session = Depends(get_db)) -> dict:
     auth_service.request_password_reset(db, payload.email)
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.async_deps import get_current_user
+from app.core.config import settings
+from app.core.rate_limit import AsyncRateLimiter, RateLimit
+from app.db.session import get_async_db, get_async_read_db
+from app.schemas.auth import (
+    LoginIn,
+    LogoutIn,
+    PasswordResetConfirmIn,
+    PasswordResetRequestIn,
+    RefreshIn,
+    RegisterIn,
+    TokenPair,
+    VerifyEmailIn,
+)
+from app.schemas.user import UserPublic
+from app.services import auth_service_async as auth_service
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+limiter = AsyncRateLimiter()
+
+
+@router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
+async def register(
+    payload: RegisterIn,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+) -> UserPublic:
+    ip = request.client.host if request.client else "unknown"
+    rate_limit = await limiter.hit(
+        f"rl:register:ip:{ip}",
+        settings.rate_limit_register,
+        settings.rate_limit_window_seconds,
+        response=response,
+    )
+    with rate_limit.headers_on_errors():
+        return await auth_service.register_user(db, payload.email, payload.password)
+
+
+@router.post("/verify-email")
+async def verify_email(payload: VerifyEmailIn, db: AsyncSession = Depends(get_async_db)) -> dict:
+    await auth_service.verify_email(db, payload.token)
+    return {"message": "Email verified"}
+
+
+@router.post("/login", response_model=TokenPair)
+async def login(
+    payload: LoginIn,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+) -> TokenPair:
+    ip = request.client.host if request.client else "unknown"
+    rate_limit = await limiter.check(
+        RateLimit(f"rl:login:ip:{ip}", settings.rate_limit_login, settings.rate_limit_window_seconds),
+        RateLimit(
+            f"rl:login:email:{payload.email.lower()}",
+            settings.rate_limit_login_email,
+            settings.rate_limit_window_seconds,
+        ),
+        response=response,
+    )
+    with rate_limit.headers_on_errors():
+        user = await auth_service.authenticate_user(db, payload.email, payload.password)
+        access_token, refresh_token = await auth_service.create_token_pair(db, user)
+    return TokenPair(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=TokenPair)
+async def refresh(payload: RefreshIn, db: AsyncSession = Depends(get_async_db)) -> TokenPair:
+    access_token, refresh_token = await auth_service.refresh_tokens(db, payload.refresh_token)
+    return TokenPair(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/logout")
+async def logout(payload: LogoutIn, db: AsyncSession = Depends(get_async_db)) -> dict:
+    await auth_service.logout(db, payload.refresh_token)
+    return {"message": "Logged out"}
+
+
+@router.post("/logout-all")
+async def logout_all(
+    user: UserPublic = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    await auth_service.logout_all(db, user.id)
+    return {"message": "Logged out of all sessions"}
+
+
+@router.post("/password-reset/request")
+async def password_reset_request(
+    payload: PasswordResetRequestIn, db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    await auth_service.request_password_reset(db, payload.email)
+    return {"message": "If the email exists, a reset token was sent"}
+
+
+@router.post("/password-reset/confirm")
+async def password_reset_confirm(
+    payload: PasswordResetConfirmIn, db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    await auth_service.confirm_password_reset(db, payload.token, payload.new_password)
+    return {"message": "Password updated"}
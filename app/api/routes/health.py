@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.health import health_monitor
 
 router = APIRouter(tags=["health"])
 
@@ -6,3 +9,14 @@ router = APIRouter(tags=["health"])
 @router.get("/health")
 def health() -> dict:
     return {"status": "ok"}
+
+
+@router.get("/health/live")
+async def live() -> dict:
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def ready() -> JSONResponse:
+    status = health_monitor.snapshot()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
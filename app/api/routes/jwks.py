@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app.core.config import settings
+from app.core.keys import get_key_ring
+
+router = APIRouter(tags=["keys"])
+
+
+@router.get("/.well-known/jwks.json")
+def jwks(request: Request) -> Response:
+    ring = get_key_ring()
+    headers = {
+        "ETag": ring.jwks_etag,
+        "Cache-Control": f"public, max-age={settings.jwks_max_age_seconds}",
+    }
+    if request.headers.get("if-none-match") == ring.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=ring.jwks_body, media_type="application/json", headers=headers)
@@ -0,0 +1,88 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.hashing import hash_executor
+from app.core.redis import pool_stats as redis_pool_stats
+from app.db.pool import pool_stats
+from app.db.replicas import replicas
+from app.db.session import async_engine, engine
+
+router = APIRouter(tags=["metrics"])
+
+
+def _database_pools() -> list:
+    engines = [("primary", engine), ("primary_async", async_engine.sync_engine)]
+    engines += [(f"replica{index}", replica) for index, replica in enumerate(replicas.engines)]
+    return [(name, pool_stats(pool)) for name, pool in engines]
+
+
+def _pool_lines() -> list:
+    pools = [(name, stats) for name, stats in _database_pools() if "size" in stats]
+    lines = []
+    for metric, kind, key, documentation in (
+        ("db_pool_size", "gauge", "size", "Configured pool size."),
+        ("db_pool_checked_out", "gauge", "checked_out", "Connections in use."),
+        ("db_pool_overflow", "gauge", "overflow", "Connections open beyond the pool size."),
+        ("db_pool_checkouts_total", "counter", "checkouts", "Connections handed out."),
+        ("db_pool_timeouts_total", "counter", "timeouts", "Checkouts that timed out."),
+    ):
+        lines += metrics.render_samples(
+            metric, kind, documentation, (({"pool": name}, stats[key]) for name, stats in pools)
+        )
+    lines += metrics.render_samples(
+        "db_pool_checkout_wait_seconds",
+        "gauge",
+        "Checkout wait over the last 1024 checkouts.",
+        (
+            ({"pool": name, "quantile": quantile}, stats[key] / 1000)
+            for name, stats in pools
+            for quantile, key in (("0.5", "wait_p50_ms"), ("0.99", "wait_p99_ms"))
+        ),
+    )
+    redis_pools = redis_pool_stats()
+    lines += metrics.render_samples(
+        "redis_pool_connections",
+        "gauge",
+        "Redis connections by client and state.",
+        (
+            ({"client": client, "state": state}, count)
+            for client, stats in redis_pools.items()
+            for state, count in stats.items()
+        ),
+    )
+    hashing = hash_executor.stats()
+    for metric, kind, key, documentation in (
+        ("hash_pool_in_flight", "gauge", "in_flight", "Hashes running on the process pool."),
+        ("hash_pool_queue_depth", "gauge", "queue_depth", "Hashes waiting for a worker."),
+        ("hash_pool_completed_total", "counter", "completed", "Hashes completed."),
+        ("hash_pool_rejected_total", "counter", "rejected", "Hashes rejected as overloaded."),
+    ):
+        lines += metrics.render_samples(metric, kind, documentation, [({}, hashing[key])])
+    return lines
+
+
+def require_metrics_token(authorization: str | None = Header(default=None)) -> None:
+    # Per-route traffic, error rates and pool state are not for the public:
+    # without METRICS_TOKEN the endpoint does not exist, and with it every
+    # scrape must send the token as a bearer credential.
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.metrics_token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def prometheus_metrics() -> Response:
+    return Response(
+        metrics.render(_pool_lines()), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
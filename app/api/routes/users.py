@@ -6,21 +6,27 @@ from app.api.deps import get_current_user
 from app.db.models.user import User
 from app.db.session import get_db
 from app.schemas.user import UserPublic, UserUpdate
+from app.services.auth_service import mark_emails_present
+from app.services.sessions import bump_user_generation
+from app.services.user_cache import invalidate_user
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserPublic)
-def get_me(user: User = Depends(get_current_user)) -> UserPublic:
+def get_me(user: UserPublic = Depends(get_current_user)) -> UserPublic:
     return user
 
 
 @router.patch("/me", response_model=UserPublic)
 def update_me(
     payload: UserUpdate,
-    user: User = Depends(get_current_user),
+    current: UserPublic = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> UserPublic:
+    user = db.get(User, current.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not active")
     if payload.email and payload.email != user.email:
         exists = db.scalar(select(User).where(User.email == payload.email))
         if exists:
@@ -28,6 +34,10 @@ def update_me(
         user.email = payload.email
         user.is_verified = False
         user.is_active = False
+        # Commits the change and ends the user's sessions on every worker.
+        bump_user_generation(db, user.id)
     db.commit()
     db.refresh(user)
+    mark_emails_present(user.email)
+    invalidate_user(user.id)
     return user
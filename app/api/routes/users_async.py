@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.async_deps import get_current_user
+from app.db.models.user import User
+from app.db.session import get_async_db
+from app.schemas.user import UserPublic, UserUpdate
+from app.services.auth_service_async import mark_emails_present
+from app.services.sessions import bump_user_generation_async
+from app.services.user_cache import invalidate_user_async
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/me", response_model=UserPublic)
+async def get_me(user: UserPublic = Depends(get_current_user)) -> UserPublic:
+    return user
+
+
+@router.patch("/me", response_model=UserPublic)
+async def update_me(
+    payload: UserUpdate,
+    current: UserPublic = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserPublic:
+    user = await db.get(User, current.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not active")
+    if payload.email and payload.email != user.email:
+        exists = await db.scalar(select(User).where(User.email == payload.email))
+        if exists:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already in use")
+        user.email = payload.email
+        user.is_verified = False
+        user.is_active = False
+        # Commits the change and ends the user's sessions on every worker.
+        await bump_user_generation_async(db, user.id)
+    await db.commit()
+    await db.refresh(user)
+    await mark_emails_present(user.email)
+    await invalidate_user_async(user.id)
+    return user
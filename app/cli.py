@@ -0,0 +1,94 @@
+import argparse
+import json
+import logging
+import threading
+
+from app.core import password_policy
+from app.core.config import settings
+from app.services import email_outbox, event_relay, maintenance, user_import
+
+
+def reap(args: argparse.Namespace) -> None:
+    stats = maintenance.run_maintenance(batch_size=args.batch_size, pause_seconds=args.pause)
+    print(json.dumps(stats))
+
+
+def import_users(args: argparse.Namespace) -> None:
+    import_format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    with open(args.path, encoding="utf-8", newline="") as stream:
+        for event in user_import.import_users(
+            stream,
+            import_format,
+            batch_size=args.batch_size,
+            send_verification=not args.no_verification_email,
+        ):
+            print(json.dumps(event), flush=True)
+
+
+def email_worker(args: argparse.Namespace) -> None:
+    try:
+        email_outbox.run_worker(threading.Event())
+    except KeyboardInterrupt:
+        pass
+
+
+def relay_events(args: argparse.Namespace) -> None:
+    try:
+        event_relay.run_relay(threading.Event())
+    except KeyboardInterrupt:
+        pass
+
+
+def calibrate_hashing(args: argparse.Namespace) -> None:
+    result = password_policy.calibrate(
+        args.scheme, args.target_ms, args.memory_kib or settings.argon2_memory_kib
+    )
+    hash_ms = result.pop("hash_ms")
+    print(f"# {hash_ms:.0f}ms per hash on this machine (target {args.target_ms:.0f}ms)")
+    for key, value in result.items():
+        print(f"{key}={value}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reap_parser = commands.add_parser(
+        "reap", help="Delete expired/used tokens and manage refresh_tokens partitions"
+    )
+    reap_parser.add_argument("--batch-size", type=int, default=None)
+    reap_parser.add_argument("--pause", type=float, default=None, help="Seconds between batches")
+    reap_parser.set_defaults(handler=reap)
+
+    import_parser = commands.add_parser(
+        "import-users", help="Bulk-create users from a CSV or NDJSON file"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    import_parser.add_argument("--batch-size", type=int, default=None)
+    import_parser.add_argument("--no-verification-email", action="store_true")
+    import_parser.set_defaults(handler=import_users)
+
+    email_parser = commands.add_parser("email-worker", help="Send queued emails until interrupted")
+    email_parser.set_defaults(handler=email_worker)
+
+    relay_parser = commands.add_parser(
+        "event-relay", help="Publish domain events to the Redis stream until interrupted"
+    )
+    relay_parser.set_defaults(handler=relay_events)
+
+    calibrate_parser = commands.add_parser(
+        "calibrate-hashing", help="Pick password hash parameters that meet a target latency"
+    )
+    calibrate_parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="argon2")
+    calibrate_parser.add_argument("--target-ms", type=float, default=250.0)
+    calibrate_parser.add_argument("--memory-kib", type=int, default=None)
+    calibrate_parser.set_defaults(handler=calibrate_hashing)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
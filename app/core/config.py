@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,26 +8,140 @@ class Settings(BaseSettings):
 
     project_name: str = "Auth & Identity Service"
     api_v1_prefix: str = "/api/v1"
+    async_mode: bool = False
+
+    # Production server (gunicorn -c gunicorn.conf.py); 0 workers = one per core.
+    web_bind: str = "0.0.0.0:8000"
+    web_workers: int = 0
+    web_preload: bool = True
+    web_keepalive_seconds: int = 5
+    web_timeout_seconds: int = 60
+    web_graceful_timeout_seconds: int = 30
 
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     postgres_db: str = "auth_service"
     postgres_user: str = "auth_user"
     postgres_password: str = "auth_password"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_statement_timeout_ms: int = 0
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    # always | on_error | interval
+    db_pre_ping: str = "always"
+    db_pre_ping_interval_seconds: float = 30.0
+    # NullPool and no prepared statements, for PgBouncer in transaction mode.
+    db_pgbouncer: bool = False
+
+    # Comma-separated SQLAlchemy URLs of read replicas; empty reads from the primary.
+    replica_urls: str = ""
+    replica_pool_size: int = 5
+    replica_max_overflow: int = 10
+    replica_statement_timeout_ms: int = 0
+    replica_max_lag_seconds: float = 5.0
+    replica_check_interval_seconds: float = 2.0
 
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 50
+    redis_pool_timeout_seconds: float = 2.0
+    redis_socket_timeout_seconds: float = 1.0
+    redis_connect_timeout_seconds: float = 1.0
+    redis_health_check_interval_seconds: int = 30
 
     jwt_secret: str = "change-me"
     jwt_algorithm: str = "HS256"
+    jwt_backend: str = "jose"
+    jwt_keys_dir: str | None = None
+    jwt_active_kid: str | None = None
+    jwks_max_age_seconds: int = 300
     access_token_minutes: int = 15
     refresh_token_days: int = 7
+    refresh_reuse_grace_seconds: int = 10
+    token_cache_size: int = 50_000
 
     email_verification_minutes: int = 60
     password_reset_minutes: int = 30
 
+    email_backend: str = "log"
+    email_from: str = "no-reply@example.com"
+    email_worker_enabled: bool = True
+    email_workers: int = 1
+    email_batch_size: int = 100
+    email_poll_interval_seconds: float = 1.0
+    email_max_attempts: int = 5
+    email_retry_base_seconds: int = 30
+    # How long a claimed batch is reserved before another worker may retry it.
+    email_claim_lease_seconds: int = 600
+    smtp_host: str = "localhost"
+    smtp_port: int = 25
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_starttls: bool = False
+    smtp_timeout_seconds: float = 10.0
+
+    events_relay_enabled: bool = True
+    events_stream: str = "auth:events"
+    events_stream_maxlen: int = 0
+    events_consumer_groups: str = "audit,analytics,fraud"
+    events_batch_size: int = 500
+    events_poll_interval_seconds: float = 0.5
+
+    # bcrypt | argon2 (argon2id); see python -m app.cli calibrate-hashing
+    password_scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_memory_kib: int = 65536
+    argon2_time_cost: int = 3
+    argon2_parallelism: int = 1
+
+    hash_workers: int = 0
+    hash_max_pending: int = 64
+
+    missing_email_cache_ttl_seconds: int = 60
+
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: int = 300
+    user_cache_local_ttl_seconds: int = 5
+
+    rate_limit_algorithm: str = "gcra"
     rate_limit_window_seconds: int = 60
     rate_limit_login: int = 5
+    rate_limit_login_email: int = 10
     rate_limit_register: int = 3
+    rate_limit_local_enabled: bool = True
+    rate_limit_local_blocked_size: int = 100_000
+    rate_limit_local_sketch_width: int = 16384
+    rate_limit_local_sketch_depth: int = 4
+    rate_limit_local_factor: int = 3
+
+    maintenance_enabled: bool = False
+    maintenance_interval_seconds: int = 3600
+    maintenance_batch_size: int = 1000
+    maintenance_batch_pause_seconds: float = 0.05
+    maintenance_lock_timeout_ms: int = 200
+    refresh_token_partitions_ahead: int = 3
+    # Partitions are managed by every app process, independent of the reaper.
+    refresh_token_partition_interval_seconds: int = 3600
+
+    import_batch_size: int = 1000
+
+    health_check_interval_seconds: float = 2.0
+    # Report not-ready once a pool or the hashing queue is this full.
+    health_saturation: float = 0.9
+
+    metrics_enabled: bool = True
+    metrics_token: str | None = None
+    server_timing_enabled: bool = False
+
+    @property
+    def web_worker_count(self) -> int:
+        return self.web_workers or os.cpu_count() or 1
+
+    # Every web worker starts its own hash pool, so by default the cores are
+    # split between them instead of each worker taking one process per core.
+    @property
+    def hash_pool_size(self) -> int:
+        return self.hash_workers or max(1, (os.cpu_count() or 1) // self.web_worker_count)
 
     @property
     def database_url(self) -> str:
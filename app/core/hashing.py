@@ -0,0 +1,141 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from fastapi import HTTPException, status
+
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import stage
+
+
+class HashExecutor:
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latencies: deque[float] = deque(maxlen=1024)
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        return self._submit(fn, *args)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> list:
+        # Bulk work skips admission control but keeps at most one task per
+        # worker outstanding, so a login submitted meanwhile waits for one
+        # hash to finish rather than for the whole batch.
+        window = threading.BoundedSemaphore(self.workers)
+        futures = []
+        for item in items:
+            window.acquire()
+            with self._lock:
+                self._pending += 1
+            try:
+                future = self._submit(fn, item)
+            except BaseException:
+                window.release()
+                raise
+            future.add_done_callback(lambda _: window.release())
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda _: self._record(time.perf_counter() - started))
+        return future
+
+    def _record(self, elapsed: float) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+            self._latencies.append(elapsed)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(pending, self.workers),
+            "queue_depth": max(0, pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_p50_ms": _percentile(latencies, 0.50) * 1000,
+            "latency_p99_ms": _percentile(latencies, 0.99) * 1000,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+hash_executor = HashExecutor(
+    workers=settings.hash_pool_size,
+    max_pending=settings.hash_max_pending,
+)
+
+
+def hash_password(password: str) -> str:
+    with stage("hash"):
+        return hash_executor.submit(security.hash_password, password).result()
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    with stage("hash"):
+        return hash_executor.submit(security.verify_password, password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    with stage("hash"):
+        return await asyncio.wrap_future(hash_executor.submit(security.hash_password, password))
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    with stage("hash"):
+        return await asyncio.wrap_future(
+            hash_executor.submit(security.verify_password, password, hashed_password)
+        )
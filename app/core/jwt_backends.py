@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import hmac
+import json
+import math
+import time
+from typing import Any, Dict, Protocol
+
+from app.core.config import settings
+
+
+class JWTBackend(Protocol):
+    name: str
+    algorithms: frozenset[str]
+
+    def prepare_key(self, key: bytes, algorithm: str) -> Any: ...
+
+    def encode(
+        self, claims: Dict[str, Any], key: Any, algorithm: str, headers: Dict[str, Any]
+    ) -> str: ...
+
+    def decode(self, token: str, key: Any, algorithm: str) -> Dict[str, Any]: ...
+
+
+def b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def unverified_header(token: str) -> Dict[str, Any]:
+    try:
+        header = json.loads(_b64decode(token.split(".", 1)[0]))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid token") from exc
+    if not isinstance(header, dict):
+        raise ValueError("Invalid token")
+    return header
+
+
+class JoseBackend:
+    name = "jose"
+    algorithms = frozenset(
+        {"HS256", "HS384", "HS512", "RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+    )
+
+    def __init__(self) -> None:
+        from jose import JWTError, jwk, jwt
+
+        self._jwk = jwk
+        self._jwt = jwt
+        self._error = JWTError
+
+    def prepare_key(self, key: bytes, algorithm: str) -> Any:
+        return self._jwk.construct(key, algorithm)
+
+    def encode(
+        self, claims: Dict[str, Any], key: Any, algorithm: str, headers: Dict[str, Any]
+    ) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: Any, algorithm: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._error as exc:
+            raise ValueError("Invalid token") from exc
+
+
+class PyJWTBackend:
+    name = "pyjwt"
+    algorithms = JoseBackend.algorithms | {"PS256", "PS384", "PS512", "EdDSA"}
+
+    def __init__(self) -> None:
+        import jwt
+        from jwt.algorithms import get_default_algorithms
+
+        self._jwt = jwt
+        self._algorithms = get_default_algorithms()
+
+    def prepare_key(self, key: bytes, algorithm: str) -> Any:
+        return self._algorithms[algorithm].prepare_key(key)
+
+    def encode(
+        self, claims: Dict[str, Any], key: Any, algorithm: str, headers: Dict[str, Any]
+    ) -> str:
+        return self._jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: Any, algorithm: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._jwt.InvalidTokenError as exc:
+            raise ValueError("Invalid token") from exc
+
+
+class FastHS256Backend:
+    # Stdlib-only HS256: one HMAC, two base64 segments and the exp/nbf checks.
+    name = "fast"
+    algorithms = frozenset({"HS256"})
+
+    def prepare_key(self, key: bytes, algorithm: str) -> bytes:
+        if algorithm != "HS256":
+            raise ValueError("The fast JWT backend only supports HS256")
+        return key
+
+    def encode(
+        self, claims: Dict[str, Any], key: bytes, algorithm: str, headers: Dict[str, Any]
+    ) -> str:
+        # Sorted header keys, like jose and PyJWT, so all three emit the same token.
+        header = {"alg": "HS256", "typ": "JWT", **headers}
+        signing_input = (
+            b64encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
+            + "."
+            + b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        )
+        signature = hmac.new(key, signing_input.encode("ascii"), hashlib.sha256).digest()
+        return f"{signing_input}.{b64encode(signature)}"
+
+    def decode(self, token: str, key: bytes, algorithm: str) -> Dict[str, Any]:
+        try:
+            signing_input, _, signature = token.rpartition(".")
+            header_segment, _, payload_segment = signing_input.partition(".")
+            if unverified_header(header_segment).get("alg") != "HS256":
+                raise ValueError("Invalid token")
+            expected = hmac.new(key, signing_input.encode("ascii"), hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                raise ValueError("Invalid token")
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, UnicodeError) as exc:
+            raise ValueError("Invalid token") from exc
+        if not isinstance(claims, dict):
+            raise ValueError("Invalid token")
+        now = time.time()
+        exp, nbf = claims.get("exp", math.inf), claims.get("nbf", 0)
+        if not isinstance(exp, (int, float)) or exp <= now:
+            raise ValueError("Invalid token")
+        if not isinstance(nbf, (int, float)) or nbf > now:
+            raise ValueError("Invalid token")
+        return claims
+
+
+BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend, "fast": FastHS256Backend}
+
+
+def get_jwt_backend(name: str | None = None) -> JWTBackend:
+    return BACKENDS[name or settings.jwt_backend]()
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.core.config import settings
+from app.core.jwt_backends import JWTBackend, b64encode, get_jwt_backend
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+EC_CURVES = {"secp256r1": "P-256", "secp384r1": "P-384", "secp521r1": "P-521"}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    verify_key: Any
+    sign_key: Any | None = None
+    jwk: dict | None = None
+
+
+class KeyRing:
+    def __init__(self, backend: JWTBackend, keys: list[SigningKey], active_kid: str) -> None:
+        self.backend = backend
+        self._keys = {key.kid: key for key in keys}
+        if active_kid not in self._keys or self._keys[active_kid].sign_key is None:
+            raise ValueError(f"Active signing key {active_kid!r} has no private key in the key ring")
+        self.active = self._keys[active_kid]
+        self.jwks_body = json.dumps(
+            {"keys": [key.jwk for key in keys if key.jwk is not None]}, separators=(",", ":")
+        ).encode()
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_body).hexdigest()[:32]}"'
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        if kid is None:
+            return self.active
+        return self._keys.get(kid)
+
+
+def _int_to_b64(value: int, length: int | None = None) -> str:
+    length = length or (value.bit_length() + 7) // 8
+    return b64encode(value.to_bytes(length, "big"))
+
+
+def public_jwk(public_key: Any, kid: str, algorithm: str) -> dict:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        numbers = public_key.public_numbers()
+        data = {"kty": "RSA", "n": _int_to_b64(numbers.n), "e": _int_to_b64(numbers.e)}
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        numbers = public_key.public_numbers()
+        size = (public_key.curve.key_size + 7) // 8
+        data = {
+            "kty": "EC",
+            "crv": EC_CURVES[public_key.curve.name],
+            "x": _int_to_b64(numbers.x, size),
+            "y": _int_to_b64(numbers.y, size),
+        }
+    elif isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        data = {"kty": "OKP", "crv": "Ed25519", "x": b64encode(raw)}
+    else:
+        raise ValueError(f"Unsupported public key type for {kid!r}")
+    data.update(kid=kid, use="sig", alg=algorithm)
+    return data
+
+
+def _load_directory(backend: JWTBackend, directory: Path, algorithm: str) -> list[SigningKey]:
+    # <kid>.pem holds a private key (can sign); <kid>.pub.pem a public key that
+    # is only published and accepted, e.g. the next key before it becomes
+    # active or a retired key whose tokens have not expired yet.
+    keys = []
+    for path in sorted(directory.glob("*.pem")):
+        pem = path.read_bytes()
+        if path.name.endswith(".pub.pem"):
+            kid = path.name[: -len(".pub.pem")]
+            private_pem = None
+            public_key = serialization.load_pem_public_key(pem)
+        else:
+            kid = path.stem
+            private_pem = pem
+            public_key = serialization.load_pem_private_key(pem, password=None).public_key()
+        public_pem = public_key.public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        keys.append(
+            SigningKey(
+                kid=kid,
+                algorithm=algorithm,
+                verify_key=backend.prepare_key(public_pem, algorithm),
+                sign_key=backend.prepare_key(private_pem, algorithm) if private_pem else None,
+                jwk=public_jwk(public_key, kid, algorithm),
+            )
+        )
+    return keys
+
+
+@lru_cache(maxsize=1)
+def get_key_ring() -> KeyRing:
+    backend = get_jwt_backend()
+    algorithm = settings.jwt_algorithm
+    if algorithm not in backend.algorithms:
+        raise ValueError(f"JWT backend {backend.name!r} does not support {algorithm}")
+
+    if algorithm in SYMMETRIC_ALGORITHMS:
+        secret = backend.prepare_key(settings.jwt_secret.encode(), algorithm)
+        kid = settings.jwt_active_kid or "default"
+        key = SigningKey(kid=kid, algorithm=algorithm, verify_key=secret, sign_key=secret)
+        return KeyRing(backend, [key], kid)
+
+    if not settings.jwt_keys_dir:
+        raise ValueError(f"JWT_KEYS_DIR is required for {algorithm}")
+    keys = _load_directory(backend, Path(settings.jwt_keys_dir), algorithm)
+    signing = [key.kid for key in keys if key.sign_key is not None]
+    active_kid = settings.jwt_active_kid or (signing[-1] if signing else "")
+    return KeyRing(backend, keys, active_kid)
@@ -0,0 +1,168 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Seconds spent per stage in the current request, set by MetricsMiddleware.
+# Sync endpoints run in a copy of the request's context, which still points
+# at the same dict.
+_request_stages: ContextVar[Dict[str, float] | None] = ContextVar("request_stages", default=None)
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [
+                (labels, list(counts), total) for labels, (counts, total) in self._series.items()
+            ]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in snapshot:
+            label_text = _labels(dict(zip(self.labelnames, labels)))
+            prefix = label_text[:-1] + "," if label_text else "{"
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'{self.name}_bucket{prefix}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, method and status.",
+    ("method", "route", "status"),
+)
+stage_duration = Histogram(
+    "auth_stage_duration_seconds",
+    "Time spent in password hashing, database queries and commits, Redis and JWT work.",
+    ("stage",),
+)
+
+
+def record_stage(name: str, elapsed: float) -> None:
+    stage_duration.observe(elapsed, name)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_samples(
+    name: str, kind: str, documentation: str, samples: Iterable[Tuple[Dict[str, Any], float]]
+) -> List[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    lines = request_duration.render() + stage_duration.render()
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(stages: Dict[str, float], total: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages.items()]
+    entries.append(f"app;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware, which costs an extra task and
+    # memory stream per request.
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+        self._routes: Dict[Callable, str] | None = None
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        # Label by route template so path parameters don't multiply series.
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stages: Dict[str, float] = {}
+        token = _request_stages.set(stages)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing_enabled:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", server_timing(stages, time.perf_counter() - started)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            request_duration.observe(
+                time.perf_counter() - started, scope["method"], self._route(scope), str(status_code)
+            )
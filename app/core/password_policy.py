@@ -0,0 +1,103 @@
+import statistics
+import time
+from typing import Any, Dict
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+SCHEMES = ("bcrypt", "argon2")
+BCRYPT_MIN_ROUNDS = 10
+ARGON2_MIN_MEMORY_KIB = 8192
+
+
+def build_context(
+    scheme: str,
+    bcrypt_rounds: int,
+    argon2_memory_kib: int,
+    argon2_time_cost: int,
+    argon2_parallelism: int,
+) -> CryptContext:
+    # Both schemes stay verifiable so existing hashes keep working after a
+    # switch. Hashes in the other scheme, or with other parameters, report
+    # needs_update and are rehashed on the next successful login.
+    if scheme not in SCHEMES:
+        raise ValueError(f"PASSWORD_SCHEME must be one of {', '.join(SCHEMES)}")
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__memory_cost=argon2_memory_kib,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+def configured_context() -> CryptContext:
+    return build_context(
+        settings.password_scheme,
+        settings.bcrypt_rounds,
+        settings.argon2_memory_kib,
+        settings.argon2_time_cost,
+        settings.argon2_parallelism,
+    )
+
+
+def _hash_seconds(context: CryptContext, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, target_ms: float, memory_kib: int, samples: int = 3) -> Dict[str, Any]:
+    # Returns the most expensive parameters whose median hash time on this
+    # machine stays within target_ms, raising cost one step at a time.
+    target = target_ms / 1000
+
+    def measure(**params: int) -> float:
+        options = {
+            "bcrypt_rounds": BCRYPT_MIN_ROUNDS,
+            "argon2_memory_kib": memory_kib,
+            "argon2_time_cost": 1,
+            "argon2_parallelism": settings.argon2_parallelism,
+            **params,
+        }
+        return _hash_seconds(build_context(scheme, **options), samples)
+
+    if scheme == "bcrypt":
+        rounds, seconds = BCRYPT_MIN_ROUNDS, measure(bcrypt_rounds=BCRYPT_MIN_ROUNDS)
+        while rounds < 20:
+            # Each round doubles the cost; stop before the next one overshoots.
+            if seconds * 2 > target:
+                break
+            rounds += 1
+            seconds = measure(bcrypt_rounds=rounds)
+        return {"PASSWORD_SCHEME": "bcrypt", "BCRYPT_ROUNDS": rounds, "hash_ms": seconds * 1000}
+
+    if scheme != "argon2":
+        raise ValueError(f"scheme must be one of {', '.join(SCHEMES)}")
+    # Memory is the cost that hurts attackers most, so shrink it only when a
+    # single pass over it already misses the target.
+    seconds = measure(argon2_memory_kib=memory_kib)
+    while seconds > target and memory_kib > ARGON2_MIN_MEMORY_KIB:
+        memory_kib //= 2
+        seconds = measure(argon2_memory_kib=memory_kib)
+    time_cost = 1
+    while time_cost < 10:
+        next_seconds = measure(argon2_memory_kib=memory_kib, argon2_time_cost=time_cost + 1)
+        if next_seconds > target:
+            break
+        time_cost, seconds = time_cost + 1, next_seconds
+    return {
+        "PASSWORD_SCHEME": "argon2",
+        "ARGON2_MEMORY_KIB": memory_kib,
+        "ARGON2_TIME_COST": time_cost,
+        "hash_ms": seconds * 1000,
+    }
@@ -1,15 +1,276 @@
-from fastapi import HTTPException
+from contextlib import contextmanager
+from dataclasses import dataclass
+import math
+import time
+from typing import Iterator
 
-from app.core.redis import get_redis
+from fastapi import HTTPException, Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.core.sketch import CountMinSketch
+
+# Every script checks all KEYS in one round-trip and only consumes quota when
+# every limit allows the request. ARGV holds (limit, period_seconds) per key.
+# Replies are flat: allowed, then (allowed, remaining, retry_after, reset_after)
+# per key. Floats are returned as strings because Redis truncates Lua numbers.
+
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local allowed = 1
+local reply = {}
+local updates = {}
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 2 - 1])
+  local period = tonumber(ARGV[i * 2])
+  local interval = period / limit
+  local tat = tonumber(redis.call('GET', key)) or now
+  if tat < now then tat = now end
+  local new_tat = tat + interval
+  local allow_at = new_tat - period
+  if allow_at > now then
+    allowed = 0
+    table.insert(reply, 0)
+    table.insert(reply, 0)
+    table.insert(reply, tostring(allow_at - now))
+    table.insert(reply, tostring(tat - now))
+  else
+    updates[key] = new_tat
+    table.insert(reply, 1)
+    table.insert(reply, math.floor((period - (new_tat - now)) / interval))
+    table.insert(reply, '0')
+    table.insert(reply, tostring(new_tat - now))
+  end
+end
+if allowed == 1 then
+  for key, new_tat in pairs(updates) do
+    redis.call('SET', key, tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+  end
+end
+table.insert(reply, 1, allowed)
+return reply
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local allowed = 1
+local reply = {}
+local updates = {}
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2 - 1])
+  local period = tonumber(ARGV[i * 2])
+  local rate = capacity / period
+  local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(bucket[1]) or capacity
+  local ts = tonumber(bucket[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  if tokens >= 1 then
+    tokens = tokens - 1
+    updates[key] = {tokens, period}
+    table.insert(reply, 1)
+    table.insert(reply, math.floor(tokens))
+    table.insert(reply, '0')
+  else
+    allowed = 0
+    table.insert(reply, 0)
+    table.insert(reply, 0)
+    table.insert(reply, tostring((1 - tokens) / rate))
+  end
+  table.insert(reply, tostring((capacity - tokens) / rate))
+end
+if allowed == 1 then
+  for key, update in pairs(updates) do
+    redis.call('HSET', key, 'tokens', tostring(update[1]), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(update[2] * 1000))
+  end
+end
+table.insert(reply, 1, allowed)
+return reply
+"""
+
+SCRIPTS = {"gcra": GCRA_SCRIPT, "token_bucket": TOKEN_BUCKET_SCRIPT}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    key: str
+    limit: int
+    window_seconds: int
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    key: str
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+    @contextmanager
+    def headers_on_errors(self) -> Iterator[None]:
+        # An HTTPException replaces the injected Response and its headers, so
+        # failed logins would otherwise report nothing until they get a 429.
+        try:
+            yield
+        except HTTPException as exc:
+            exc.headers = {**self.headers(), **(exc.headers or {})}
+            raise
+
+
+def _script_args(limits: tuple[RateLimit, ...]) -> tuple[list[str], list[int]]:
+    keys = [limit.key for limit in limits]
+    args: list[int] = []
+    for limit in limits:
+        args.extend((limit.limit, limit.window_seconds))
+    return keys, args
+
+
+def _parse_reply(limits: tuple[RateLimit, ...], reply: list) -> RateLimitResult:
+    results = []
+    for index, limit in enumerate(limits):
+        allowed, remaining, retry_after, reset_after = reply[1 + index * 4 : 5 + index * 4]
+        results.append(
+            RateLimitResult(
+                key=limit.key,
+                allowed=bool(int(allowed)),
+                limit=limit.limit,
+                remaining=int(remaining),
+                retry_after=float(retry_after),
+                reset_after=float(reset_after),
+            )
+        )
+    if int(reply[0]):
+        return min(results, key=lambda result: result.remaining)
+    return max(
+        (result for result in results if not result.allowed), key=lambda result: result.retry_after
+    )
+
+
+# Per-worker first tier in front of Redis. Keys Redis has denied are remembered
+# until their Retry-After elapses. A count-min sketch counts the attempts that
+# reach Redis, and sheds a key only once Redis has denied it this window and it
+# has made more than `factor` times its limit in attempts. Locally denied
+# attempts are not counted, and shedding stops while the sketch is loaded
+# enough that its overestimates could reach the threshold, so many distinct
+# keys within their limits never get a key shed that Redis would allow.
+class LocalPrefilter:
+    def __init__(
+        self, blocked_size: int, width: int, depth: int, factor: int, window_seconds: int
+    ) -> None:
+        self.factor = factor
+        self.blocked = TTLCache(maxsize=blocked_size, ttl=window_seconds)
+        self.denied = TTLCache(maxsize=blocked_size, ttl=window_seconds)
+        self.attempts = CountMinSketch(width=width, depth=depth, window_seconds=window_seconds)
+
+    def check(self, limits: tuple[RateLimit, ...]) -> RateLimitResult | None:
+        now = time.monotonic()
+        for limit in limits:
+            blocked_until = self.blocked.get(limit.key)
+            if blocked_until is not None and blocked_until > now:
+                return _local_denial(limit, blocked_until - now)
+        load = self.attempts.load()
+        for limit in limits:
+            threshold = limit.limit * self.factor
+            if (
+                limit.key in self.denied
+                and load * 2 <= threshold
+                and self.attempts.estimate(limit.key) > threshold
+            ):
+                return _local_denial(limit, self.attempts.window_remaining())
+        for limit in limits:
+            self.attempts.add(limit.key)
+        return None
+
+    def block(self, result: RateLimitResult) -> None:
+        self.blocked.set(result.key, time.monotonic() + result.retry_after, ttl=result.retry_after)
+        self.denied.set(result.key, True)
+
+
+def _local_denial(limit: RateLimit, retry_after: float) -> RateLimitResult:
+    return RateLimitResult(
+        key=limit.key,
+        allowed=False,
+        limit=limit.limit,
+        remaining=0,
+        retry_after=retry_after,
+        reset_after=retry_after,
+    )
+
+
+prefilter = (
+    LocalPrefilter(
+        blocked_size=settings.rate_limit_local_blocked_size,
+        width=settings.rate_limit_local_sketch_width,
+        depth=settings.rate_limit_local_sketch_depth,
+        factor=settings.rate_limit_local_factor,
+        window_seconds=settings.rate_limit_window_seconds,
+    )
+    if settings.rate_limit_local_enabled
+    else None
+)
+
+
+def _enforce(result: RateLimitResult, response: Response | None) -> RateLimitResult:
+    if not result.allowed:
+        if prefilter is not None:
+            prefilter.block(result)
+        raise HTTPException(status_code=429, detail="Too many requests", headers=result.headers())
+    if response is not None:
+        response.headers.update(result.headers())
+    return result
 
 
 class RateLimiter:
-    def __init__(self) -> None:
-        self.redis = get_redis()
-
-    def hit(self, key: str, limit: int, window_seconds: int) -> None:
-        count = self.redis.incr(key)
-        if count == 1:
-            self.redis.expire(key, window_seconds)
-        if count > limit:
-            raise HTTPException(status_code=429, detail="Too many requests")
+    def __init__(self, algorithm: str | None = None) -> None:
+        self.source = SCRIPTS[algorithm or settings.rate_limit_algorithm]
+        self._script = None
+
+    def check(self, *limits: RateLimit, response: Response | None = None) -> RateLimitResult:
+        local = prefilter.check(limits) if prefilter is not None else None
+        if local is not None:
+            return _enforce(local, response)
+        if self._script is None:
+            self._script = get_redis().register_script(self.source)
+        keys, args = _script_args(limits)
+        reply = self._script(keys=keys, args=args, client=get_redis())
+        return _enforce(_parse_reply(limits, reply), response)
+
+    def hit(
+        self, key: str, limit: int, window_seconds: int, response: Response | None = None
+    ) -> RateLimitResult:
+        return self.check(RateLimit(key, limit, window_seconds), response=response)
+
+
+class AsyncRateLimiter:
+    def __init__(self, algorithm: str | None = None) -> None:
+        self.source = SCRIPTS[algorithm or settings.rate_limit_algorithm]
+        self._script = None
+
+    async def check(self, *limits: RateLimit, response: Response | None = None) -> RateLimitResult:
+        local = prefilter.check(limits) if prefilter is not None else None
+        if local is not None:
+            return _enforce(local, response)
+        if self._script is None:
+            self._script = get_async_redis().register_script(self.source)
+        keys, args = _script_args(limits)
+        reply = await self._script(keys=keys, args=args, client=get_async_redis())
+        return _enforce(_parse_reply(limits, reply), response)
+
+    async def hit(
+        self, key: str, limit: int, window_seconds: int, response: Response | None = None
+    ) -> RateLimitResult:
+        return await self.check(RateLimit(key, limit, window_seconds), response=response)
@@ -1,7 +1,89 @@
 import redis
+import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.core.metrics import stage
+
+
+class TimedRedis(redis.Redis):
+    def execute_command(self, *args, **options):
+        with stage("redis"):
+            return super().execute_command(*args, **options)
+
+
+class TimedAsyncRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        with stage("redis"):
+            return await super().execute_command(*args, **options)
+
+
+_pool: redis.BlockingConnectionPool | None = None
+_async_pool: aioredis.BlockingConnectionPool | None = None
+
+
+def _pool_options() -> dict:
+    return {
+        "decode_responses": True,
+        "max_connections": settings.redis_max_connections,
+        "timeout": settings.redis_pool_timeout_seconds,
+        "socket_timeout": settings.redis_socket_timeout_seconds,
+        "socket_connect_timeout": settings.redis_connect_timeout_seconds,
+        "health_check_interval": settings.redis_health_check_interval_seconds,
+        "retry_on_timeout": True,
+    }
+
+
+def get_redis_pool() -> redis.BlockingConnectionPool:
+    global _pool
+    if _pool is None:
+        _pool = redis.BlockingConnectionPool.from_url(settings.redis_url, **_pool_options())
+    return _pool
 
 
 def get_redis() -> redis.Redis:
-    return redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return TimedRedis(connection_pool=get_redis_pool())
+
+
+def get_async_redis_pool() -> aioredis.BlockingConnectionPool:
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = aioredis.BlockingConnectionPool.from_url(settings.redis_url, **_pool_options())
+    return _async_pool
+
+
+def get_async_redis() -> aioredis.Redis:
+    return TimedAsyncRedis(connection_pool=get_async_redis_pool())
+
+
+def pool_stats() -> dict:
+    stats = {}
+    if _pool is not None:
+        idle = sum(1 for connection in _pool.pool.queue if connection is not None)
+        stats["sync"] = {"in_use": len(_pool._connections) - idle, "idle": idle}
+    if _async_pool is not None:
+        stats["async"] = {
+            "in_use": len(_async_pool._in_use_connections),
+            "idle": len(_async_pool._available_connections),
+        }
+    return stats
+
+
+def reset_redis() -> None:
+    # Forget pools inherited from the parent process without disconnecting,
+    # which would close the parent's sockets; each worker builds its own.
+    global _pool, _async_pool
+    _pool = _async_pool = None
+
+
+def close_redis() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.disconnect()
+        _pool = None
+
+
+async def close_async_redis() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.disconnect()
+        _async_pool = None
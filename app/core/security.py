@@ -1,13 +1,22 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from functools import lru_cache
+import hashlib
+import secrets
+import time
+from typing import Any, Dict, Tuple
 from uuid import uuid4
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.jwt_backends import unverified_header
+from app.core.keys import get_key_ring
+from app.core.metrics import stage
+from app.core.password_policy import configured_context
+
+pwd_context = configured_context()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Validated claims keyed by token digest, each kept until the token's exp.
+verified_tokens = TTLCache(maxsize=settings.token_cache_size, ttl=settings.access_token_minutes * 60)
 
 
 def hash_password(password: str) -> str:
@@ -18,36 +27,75 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
-def create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
+@lru_cache(maxsize=1)
+def dummy_password_hash() -> str:
+    # Verified against for unknown emails so they cost the same as a wrong password.
+    return pwd_context.hash(secrets.token_urlsafe(16))
+
+
+def mint_token(
+    subject: str,
+    token_type: str,
+    expires_delta: timedelta,
+    extra_claims: Dict[str, Any] | None = None,
+) -> Tuple[str, Dict[str, Any]]:
     now = datetime.now(timezone.utc)
-    payload: Dict[str, Any] = {
+    claims: Dict[str, Any] = {
         "sub": subject,
         "jti": str(uuid4()),
-        "iat": now,
-        "exp": now + expires_delta,
+        "iat": int(now.timestamp()),
+        "exp": int((now + expires_delta).timestamp()),
         "type": token_type,
+        **(extra_claims or {}),
     }
-    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return sign_claims(claims), claims
+
+
+def sign_claims(claims: Dict[str, Any]) -> str:
+    ring = get_key_ring()
+    key = ring.active
+    with stage("jwt"):
+        return ring.backend.encode(claims, key.sign_key, key.algorithm, {"kid": key.kid})
 
 
-def create_access_token(subject: str) -> str:
-    return create_token(
+def create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
+    return mint_token(subject, token_type, expires_delta)[0]
+
+
+def create_access_token(subject: str, extra_claims: Dict[str, Any] | None = None) -> str:
+    return mint_token(
         subject=subject,
         token_type="access",
         expires_delta=timedelta(minutes=settings.access_token_minutes),
-    )
+        extra_claims=extra_claims,
+    )[0]
 
 
-def create_refresh_token(subject: str) -> str:
-    return create_token(
+def create_refresh_token(
+    subject: str, extra_claims: Dict[str, Any] | None = None
+) -> Tuple[str, Dict[str, Any]]:
+    return mint_token(
         subject=subject,
         token_type="refresh",
         expires_delta=timedelta(days=settings.refresh_token_days),
+        extra_claims=extra_claims,
     )
 
 
 def decode_token(token: str) -> Dict[str, Any]:
-    try:
-        return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-    except JWTError as exc:
-        raise ValueError("Invalid token") from exc
+    digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    claims = verified_tokens.get(digest)
+    if claims is not None:
+        return claims
+
+    ring = get_key_ring()
+    key = ring.get(unverified_header(token).get("kid"))
+    if key is None:
+        raise ValueError("Unknown signing key")
+    with stage("jwt"):
+        claims = ring.backend.decode(token, key.verify_key, key.algorithm)
+
+    ttl = claims.get("exp", 0) - time.time()
+    if ttl > 0:
+        verified_tokens.set(digest, claims, ttl=ttl)
+    return claims
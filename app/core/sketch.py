@@ -0,0 +1,55 @@
+from array import array
+import hashlib
+import struct
+import threading
+import time
+
+
+class CountMinSketch:
+    def __init__(self, width: int, depth: int, window_seconds: float) -> None:
+        self.width = width
+        self.depth = depth
+        self.window_seconds = window_seconds
+        self._counts = array("I", bytes(4 * width * depth))
+        self._unpack = struct.Struct(f"<{depth}I").unpack
+        self._window_started = time.monotonic()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _indexes(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [row * self.width + value % self.width for row, value in enumerate(self._unpack(digest))]
+
+    def window_remaining(self) -> float:
+        return max(0.0, self.window_seconds - (time.monotonic() - self._window_started))
+
+    def _roll(self) -> None:
+        if time.monotonic() - self._window_started >= self.window_seconds:
+            self._counts = array("I", bytes(4 * self.width * self.depth))
+            self._window_started = time.monotonic()
+            self._total = 0
+
+    def load(self) -> float:
+        # Average count per cell, roughly what any key may be overestimated by.
+        with self._lock:
+            self._roll()
+            return self._total / self.width
+
+    def estimate(self, key: str) -> int:
+        indexes = self._indexes(key)
+        with self._lock:
+            self._roll()
+            return min(self._counts[index] for index in indexes)
+
+    def add(self, key: str) -> int:
+        # Conservative update: only the cells holding the current minimum are
+        # raised, which keeps collisions from inflating other keys' counts.
+        indexes = self._indexes(key)
+        with self._lock:
+            self._roll()
+            estimate = min(self._counts[index] for index in indexes) + 1
+            for index in indexes:
+                if self._counts[index] < estimate:
+                    self._counts[index] = estimate
+            self._total += 1
+        return estimate
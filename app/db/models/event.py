@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import JSON, BigInteger, DateTime, Identity, Index, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DomainEvent(Base):
+    __tablename__ = "domain_events"
+    __table_args__ = (
+        Index("ix_domain_events_unpublished", "id", postgresql_where=text("published_at IS NULL")),
+        Index(
+            "ix_domain_events_published_at",
+            "published_at",
+            "id",
+            postgresql_where=text("published_at IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    # No foreign key: events outlive the user they describe.
+    user_id: Mapped[UUID | None] = mapped_column(UUID(as_uuid=True))
+    data: Mapped[Dict[str, Any]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), default=dict, nullable=False
+    )
+    published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -9,12 +9,29 @@ from app.db.base import Base
 
 
 class RefreshToken(Base):
+    # Range-partitioned by expires_at (0004), and Postgres requires every
+    # unique constraint to include the partition key, so uniqueness is on
+    # (token_jti, expires_at). A jti is a uuid4 minted together with its
+    # expiry and never reused, so no two rows share one in practice.
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        UniqueConstraint("token_jti", "expires_at", name="refresh_tokens_token_jti_key"),
+        Index(
+            "ix_refresh_tokens_family_id_active",
+            "family_id",
+            postgresql_include=["token_jti"],
+            postgresql_where=text("revoked_at IS NULL"),
+        ),
+        Index("ix_refresh_tokens_expires_at", "expires_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    token_jti: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False
+    )
+    family_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    token_jti: Mapped[str] = mapped_column(String(64), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
     revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -23,9 +40,20 @@ class RefreshToken(Base):
 
 class EmailVerificationToken(Base):
     __tablename__ = "email_verification_tokens"
+    __table_args__ = (
+        Index("ix_email_verification_tokens_expires_at", "expires_at", "id"),
+        Index(
+            "ix_email_verification_tokens_used_at",
+            "used_at",
+            "id",
+            postgresql_where=text("used_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False
+    )
     token: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -36,9 +64,20 @@ class EmailVerificationToken(Base):
 
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
+    __table_args__ = (
+        Index("ix_password_reset_tokens_expires_at", "expires_at", "id"),
+        Index(
+            "ix_password_reset_tokens_used_at",
+            "used_at",
+            "id",
+            postgresql_where=text("used_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False
+    )
     token: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,161 @@
+from collections import deque
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import record_stage
+
+PRE_PING_MODES = ("always", "on_error", "interval")
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=1024)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait = 0.0
+
+    def record_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(elapsed)
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def waits(self) -> list[float]:
+        with self._lock:
+            return sorted(self._waits)
+
+
+class _TimedPool:
+    # Times each checkout from request to hand-over, which includes queueing
+    # behind other requests once the pool and its overflow are in use.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(
+    url: str, pool_size: int, max_overflow: int, statement_timeout_ms: int, is_async: bool = False
+) -> dict:
+    is_postgres = url.startswith("postgresql")
+    if settings.db_pgbouncer:
+        # PgBouncer in transaction mode pools the server connections: keep no
+        # client-side pool, and never prepare statements, since the next
+        # transaction may run on a server connection that lacks them. Set
+        # statement timeouts on the database role instead; PgBouncer rejects
+        # the startup options parameter.
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if is_postgres:
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+    if settings.db_pre_ping not in PRE_PING_MODES:
+        raise ValueError(f"DB_PRE_PING must be one of {', '.join(PRE_PING_MODES)}")
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_pre_ping": settings.db_pre_ping == "always",
+    }
+    if statement_timeout_ms and is_postgres:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
+
+def instrument(engine: Engine) -> None:
+    # Takes the sync engine; pass async_engine.sync_engine for async engines.
+    _time_queries(engine)
+    if settings.db_pre_ping == "interval" and not settings.db_pgbouncer:
+        _ping_idle_connections(engine)
+
+
+def _time_queries(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(connection, cursor, statement, parameters, context, executemany) -> None:
+        connection.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(connection, cursor, statement, parameters, context, executemany) -> None:
+        record_stage("db", time.perf_counter() - connection.info.pop("query_started"))
+
+
+def _ping_idle_connections(engine: Engine) -> None:
+    # "interval" pings only connections that sat idle longer than
+    # DB_PRE_PING_INTERVAL_SECONDS, which are the ones a server restart or an
+    # idle timeout is likely to have closed. "on_error" never pings and
+    # relies on SQLAlchemy invalidating the pool after a disconnect error.
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, record) -> None:
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, record, proxy) -> None:
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None:
+            return
+        if time.monotonic() - checked_in_at < settings.db_pre_ping_interval_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as error:
+            # The pool discards the connection and retries with a new one.
+            raise exc.DisconnectionError() from error
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, _TimedPool):
+        return {"pool": type(pool).__name__}
+    waits = pool.stats.waits()
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": pool._max_overflow,
+        "checkouts": pool.stats.checkouts,
+        "timeouts": pool.stats.timeouts,
+        "wait_p50_ms": _percentile(waits, 0.50) * 1000,
+        "wait_p99_ms": _percentile(waits, 0.99) * 1000,
+        "wait_max_ms": pool.stats.max_wait * 1000,
+    }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
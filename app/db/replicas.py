@@ -0,0 +1,104 @@
+import itertools
+import logging
+import threading
+from typing import List
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.db.pool import engine_options, instrument
+
+logger = logging.getLogger("auth.db")
+
+# Seconds of replay lag; 0 when the replica has applied everything it received.
+LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _replica_options(url: str, is_async: bool = False) -> dict:
+    return engine_options(
+        url,
+        settings.replica_pool_size,
+        settings.replica_max_overflow,
+        settings.replica_statement_timeout_ms,
+        is_async,
+    )
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(url, **_replica_options(url))
+    instrument(engine)
+    return engine
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str]) -> None:
+        self.urls = urls
+        self.engines = [_create_engine(url) for url in urls]
+        self._async_engines: List[AsyncEngine | None] = [None] * len(urls)
+        # Last measured lag per replica; None until checked or after a failed check.
+        self.lag: List[float | None] = [None] * len(urls)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self) -> int | None:
+        # Round-robin over replicas whose last check was within the lag budget;
+        # None sends the read to the primary.
+        healthy = [
+            index
+            for index, lag in enumerate(self.lag)
+            if lag is not None and lag <= settings.replica_max_lag_seconds
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def async_engine(self, index: int) -> AsyncEngine:
+        with self._lock:
+            if self._async_engines[index] is None:
+                url = self.urls[index]
+                engine = create_async_engine(url, **_replica_options(url, is_async=True))
+                instrument(engine.sync_engine)
+                self._async_engines[index] = engine
+            return self._async_engines[index]
+
+    def check(self) -> None:
+        for index, engine in enumerate(self.engines):
+            self.lag[index] = _measure_lag(engine)
+
+    def monitor(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self.check()
+            stop.wait(settings.replica_check_interval_seconds)
+
+    def dispose(self, close: bool = True) -> None:
+        for engine in self.engines:
+            engine.dispose(close=close)
+        for async_engine in self._async_engines:
+            if async_engine is not None:
+                async_engine.sync_engine.dispose(close=close)
+
+    def stats(self) -> List[dict]:
+        return [
+            {"replica": index, "lag_seconds": lag, "healthy": lag is not None}
+            for index, lag in enumerate(self.lag)
+        ]
+
+
+def _measure_lag(engine: Engine) -> float | None:
+    try:
+        with engine.connect() as connection:
+            if engine.dialect.name != "postgresql":
+                connection.execute(text("SELECT 1"))
+                return 0.0
+            return float(connection.scalar(LAG_SQL))
+    except Exception:
+        logger.warning("Replica %s failed its lag check", engine.url, exc_info=True)
+        return None
+
+
+replicas = ReplicaSet([url.strip() for url in settings.replica_urls.split(",") if url.strip()])
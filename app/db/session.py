@@ -1,10 +1,80 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Select, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import stage
+from app.db.pool import engine_options, instrument
+from app.db.replicas import replicas
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# Session.info keys: READ_REPLICA marks a session whose plain SELECTs may go
+# to a replica; REPLICA_USED records that one of them did.
+READ_REPLICA = "read_replica"
+REPLICA_USED = "replica_used"
+
+
+def _primary_options(is_async: bool = False) -> dict:
+    return engine_options(
+        settings.database_url,
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_statement_timeout_ms,
+        is_async,
+    )
+
+
+class RoutingSession(Session):
+    # Reads go to a replica only while the session has not written: the first
+    # flush, INSERT/UPDATE/DELETE, FOR UPDATE or text statement pins it to the
+    # primary for the rest of its life, so a request reads its own writes.
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get(READ_REPLICA):
+            plain_select = isinstance(clause, Select) and clause._for_update_arg is None
+            if plain_select and not self._flushing:
+                index = replicas.choose()
+                if index is not None:
+                    self.info[REPLICA_USED] = True
+                    return self._replica_bind(index)
+            else:
+                self.info[READ_REPLICA] = False
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def _replica_bind(self, index: int):
+        return replicas.engines[index]
+
+    def commit(self) -> None:
+        # Flushing first keeps the flushed statements in the "db" stage and
+        # leaves only the COMMIT round-trip in "commit".
+        self.flush()
+        with stage("commit"):
+            super().commit()
+
+
+class AsyncRoutingSession(RoutingSession):
+    def _replica_bind(self, index: int):
+        return replicas.async_engine(index).sync_engine
+
+
+def reads_from_replica(db: Session | AsyncSession) -> bool:
+    return bool(db.info.get(READ_REPLICA) and db.info.get(REPLICA_USED))
+
+
+def use_primary(db: Session | AsyncSession) -> None:
+    db.info[READ_REPLICA] = False
+
+
+engine = create_engine(settings.database_url, **_primary_options())
+instrument(engine)
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False)
+
+async_engine = create_async_engine(settings.database_url, **_primary_options(is_async=True))
+instrument(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=AsyncRoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 
 def get_db():
@@ -13,3 +83,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = SessionLocal(info={READ_REPLICA: True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncSessionLocal(info={READ_REPLICA: True}) as db:
+        yield db
@@ -1,15 +1,82 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import threading
+
 from fastapi import FastAPI
 
-from app.api.routes import admin, auth, health, users
+from app.api.routes import admin, auth, auth_async, health, jwks, metrics, users, users_async
 from app.core.config import settings
+from app.core.hashing import hash_executor
+from app.core.keys import get_key_ring
+from app.core.metrics import MetricsMiddleware
+from app.core.redis import close_async_redis, close_redis, reset_redis
+from app.core.security import dummy_password_hash
+from app.db.replicas import replicas
+from app.db.session import async_engine, engine
+from app.services import email_outbox, event_relay, maintenance, password_upgrade
+from app.services.health import health_monitor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Under a preloading server this runs in each worker after fork: drop any
+    # pooled connections or Redis pools inherited from the master, without
+    # closing the sockets it still owns.
+    engine.dispose(close=False)
+    await async_engine.dispose(close=False)
+    replicas.dispose(close=False)
+    reset_redis()
+    get_key_ring()
+    dummy_password_hash()
+    reaper = None
+    if settings.maintenance_enabled:
+        reaper = asyncio.create_task(
+            maintenance.run_periodically(settings.maintenance_interval_seconds)
+        )
+    stop = threading.Event()
+    workers = [
+        asyncio.create_task(asyncio.to_thread(health_monitor.monitor, stop)),
+        asyncio.create_task(asyncio.to_thread(maintenance.run_partition_manager, stop)),
+    ]
+    if settings.email_worker_enabled:
+        workers += [
+            asyncio.create_task(asyncio.to_thread(email_outbox.run_worker, stop))
+            for _ in range(settings.email_workers)
+        ]
+    if settings.events_relay_enabled:
+        workers.append(asyncio.create_task(asyncio.to_thread(event_relay.run_relay, stop)))
+    if replicas.engines:
+        workers.append(asyncio.create_task(asyncio.to_thread(replicas.monitor, stop)))
+    yield
+    stop.set()
+    await asyncio.gather(*workers)
+    if reaper is not None:
+        reaper.cancel()
+        with suppress(asyncio.CancelledError):
+            await reaper
+    password_upgrade.shutdown()
+    hash_executor.shutdown()
+    engine.dispose()
+    await async_engine.dispose()
+    replicas.dispose()
+    close_redis()
+    await close_async_redis()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.project_name)
+    app = FastAPI(title=settings.project_name, lifespan=lifespan)
 
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
     app.include_router(health.router)
-    app.include_router(auth.router, prefix=settings.api_v1_prefix)
-    app.include_router(users.router, prefix=settings.api_v1_prefix)
+    app.include_router(jwks.router)
+    if settings.async_mode:
+        app.include_router(auth_async.router, prefix=settings.api_v1_prefix)
+        app.include_router(users_async.router, prefix=settings.api_v1_prefix)
+    else:
+        app.include_router(auth.router, prefix=settings.api_v1_prefix)
+        app.include_router(users.router, prefix=settings.api_v1_prefix)
     app.include_router(admin.router, prefix=settings.api_v1_prefix)
 
     return app
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 from app.db.models.user import UserRole
 
@@ -17,5 +17,22 @@ class UserPublic(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class UserPage(BaseModel):
+    items: list[UserPublic]
+    next_cursor: str | None = None
+
+
+class CachedUser(UserPublic):
+    session_generation: int = 0
+
+
+class UserImportRow(BaseModel):
+    email: EmailStr
+    password: str | None = Field(default=None, min_length=8, max_length=128)
+    password_hash: str | None = None
+    role: UserRole = UserRole.user
+    is_verified: bool = False
+
+
 class UserUpdate(BaseModel):
     email: EmailStr | None = None
@@ -0,0 +1,108 @@
+import base64
+import csv
+from dataclasses import dataclass
+from datetime import datetime
+import io
+import json
+from typing import Iterator, List, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.db.models.user import User, UserRole
+from app.db.session import READ_REPLICA, SessionLocal
+
+USER_COLUMNS = (User.id, User.email, User.is_active, User.is_verified, User.role, User.created_at)
+EXPORT_FIELDS = ["id", "email", "is_active", "is_verified", "role", "created_at"]
+EXPORT_BATCH_SIZE = 1000
+
+
+@dataclass
+class UserFilters:
+    role: UserRole | None = None
+    is_verified: bool | None = None
+    is_active: bool | None = None
+    email_prefix: str | None = None
+
+
+def encode_cursor(row: Row) -> str:
+    raw = json.dumps([row.created_at.isoformat(), str(row.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, user_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filtered_users(filters: UserFilters) -> Select:
+    # Plain column rows in (created_at DESC, id DESC) order, served by
+    # ix_users_created_at_id; no ORM objects are built.
+    query = select(*USER_COLUMNS)
+    if filters.role is not None:
+        query = query.where(User.role == filters.role)
+    if filters.is_verified is not None:
+        query = query.where(User.is_verified == filters.is_verified)
+    if filters.is_active is not None:
+        query = query.where(User.is_active == filters.is_active)
+    if filters.email_prefix:
+        query = query.where(User.email.like(f"{_escape_like(filters.email_prefix)}%", escape="\\"))
+    return query.order_by(User.created_at.desc(), User.id.desc())
+
+
+def list_users_page(
+    db: Session, filters: UserFilters, limit: int, cursor: str | None = None
+) -> Tuple[List[Row], str | None]:
+    query = filtered_users(filters)
+    if cursor:
+        query = query.where(tuple_(User.created_at, User.id) < decode_cursor(cursor))
+    rows = db.execute(query.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor(rows[limit - 1])
+
+
+def _export_record(row: Row) -> dict:
+    return {
+        "id": str(row.id),
+        "email": row.email,
+        "is_active": row.is_active,
+        "is_verified": row.is_verified,
+        "role": row.role.value,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def export_users(filters: UserFilters, export_format: str) -> Iterator[str]:
+    # Owns its session: the request's session is closed before streaming
+    # starts. yield_per streams through a server-side cursor, so memory stays
+    # flat regardless of how many users match.
+    with SessionLocal(info={READ_REPLICA: True}) as db:
+        query = filtered_users(filters).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        result = db.execute(query)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for rows in result.partitions():
+                writer.writerows(_export_record(row) for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(json.dumps(_export_record(row)) + "\n" for row in rows)
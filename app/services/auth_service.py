@@ -1,33 +1,183 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import json
 import secrets
-from typing import Tuple
+from typing import Any, Dict, Tuple
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, update
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.hashing import hash_password, verify_password
 from app.core.redis import get_redis
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    dummy_password_hash,
+    sign_claims,
 )
 from app.db.models.token import EmailVerificationToken, PasswordResetToken, RefreshToken
 from app.db.models.user import User
-from app.services.email_service import send_password_reset_email, send_verification_email
+from app.db.session import reads_from_replica, use_primary
+from app.services import events, password_upgrade
+from app.services.email_service import enqueue_password_reset_email, enqueue_verification_email
+from app.services.sessions import (
+    REDIS_SESSION_GEN_PREFIX,
+    bump_user_generation,
+    get_role_generation,
+    get_user_generation,
+    session_claims,
+)
+from app.services.user_cache import invalidate_user
 
 REDIS_REFRESH_PREFIX = "refresh:"
+REDIS_REFRESH_SUCCESSOR_PREFIX = "refresh_successor:"
+REPLAYED = "replayed"
+
+# Consumes the presented refresh jti and registers its successor in one step,
+# so two concurrent refreshes of the same token cannot both mint one. The
+# successor's claims (ARGV[3]) are kept in KEYS[4] for ARGV[4] seconds, and a
+# refresh of the same token within that window gets them back. Returns nil
+# when the jti was already consumed or revoked and the window has passed, or
+# the token's session generation (ARGV[2]) is behind the one in KEYS[3].
+ROTATE_REFRESH_SCRIPT = """
+local generation = redis.call('GET', KEYS[3])
+if generation and generation ~= ARGV[2] then
+  return false
+end
+local owner = redis.call('GETDEL', KEYS[1])
+if owner then
+  redis.call('SET', KEYS[2], owner, 'EX', ARGV[1])
+  if tonumber(ARGV[4]) > 0 then
+    redis.call('SET', KEYS[4], ARGV[3], 'EX', ARGV[4])
+  end
+  return {'rotated'}
+end
+local successor = redis.call('GET', KEYS[4])
+if successor then
+  return {'replayed', successor}
+end
+return false
+"""
+
+# Login caches emails the primary had no user for, shared by every worker.
+# Registration, import and email changes overwrite the entry with PRESENT
+# rather than deleting it, so a login that missed just before the insert
+# cannot put a stale MISSING back (it only writes with NX).
+REDIS_MISSING_EMAIL_PREFIX = "missing_email:"
+EMAIL_MISSING = "1"
+EMAIL_PRESENT = "0"
 
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _decode_refresh_token(refresh_token: str) -> Dict[str, Any]:
+    try:
+        payload = decode_token(refresh_token)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        ) from exc
+    if payload.get("type") != "refresh":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return payload
+
+
+def _refresh_ttl(claims: Dict[str, Any]) -> int:
+    return max(1, int(claims["exp"] - _now().timestamp()))
+
+
+def _consume_refresh_statement(jti: str, session_generation: int):
+    owner = select(User).where(User.id == RefreshToken.user_id)
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_jti == jti,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > _now(),
+            owner.with_only_columns(User.session_generation).scalar_subquery()
+            == session_generation,
+        )
+        .values(revoked_at=_now())
+        .returning(
+            RefreshToken.user_id,
+            RefreshToken.family_id,
+            owner.with_only_columns(User.role).scalar_subquery().label("role"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _insert_refresh_statement(user_id: UUID, family_id: UUID, claims: Dict[str, Any]):
+    return insert(RefreshToken).values(
+        user_id=user_id,
+        family_id=family_id,
+        token_jti=claims["jti"],
+        expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
+    )
+
+
+def _reused_family_statement(jti: str):
+    # Locks the row so a rotation still in flight commits its successor first;
+    # revoking the family afterwards then covers that successor too.
+    return (
+        select(RefreshToken.family_id)
+        .where(RefreshToken.token_jti == jti, RefreshToken.revoked_at.is_not(None))
+        .with_for_update()
+    )
+
+
+def _revoke_family_statement(family_id: UUID):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_now())
+        .returning(RefreshToken.token_jti)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@lru_cache(maxsize=1)
+def _rotate_script():
+    return get_redis().register_script(ROTATE_REFRESH_SCRIPT)
+
+
 def _get_user_by_email(db: Session, email: str) -> User | None:
-    return db.scalar(select(User).where(User.email == email))
+    # populate_existing: a re-read on the primary replaces a replica's copy.
+    return db.scalar(
+        select(User).where(User.email == email).execution_options(populate_existing=True)
+    )
+
+
+def _email_known_missing(email: str) -> bool:
+    return get_redis().get(f"{REDIS_MISSING_EMAIL_PREFIX}{email}") == EMAIL_MISSING
+
+
+def _remember_missing_email(email: str) -> None:
+    get_redis().set(
+        f"{REDIS_MISSING_EMAIL_PREFIX}{email}",
+        EMAIL_MISSING,
+        ex=settings.missing_email_cache_ttl_seconds,
+        nx=True,
+    )
+
+
+def mark_emails_present(*emails: str) -> None:
+    if not emails:
+        return
+    pipe = get_redis().pipeline(transaction=False)
+    for email in emails:
+        pipe.set(
+            f"{REDIS_MISSING_EMAIL_PREFIX}{email}",
+            EMAIL_PRESENT,
+            ex=settings.missing_email_cache_ttl_seconds,
+        )
+    pipe.execute()
 
 
 def register_user(db: Session, email: str, password: str) -> User:
@@ -48,10 +198,11 @@ def register_user(db: Session, email: str, password: str) -> User:
     expires_at = _now() + timedelta(minutes=settings.email_verification_minutes)
     verification = EmailVerificationToken(user_id=user.id, token=token_value, expires_at=expires_at)
     db.add(verification)
+    enqueue_verification_email(db, user.email, token_value)
+    events.record_event(db, events.USER_REGISTERED, user.id, email=user.email)
     db.commit()
     db.refresh(user)
-
-    send_verification_email(user.email, token_value)
+    mark_emails_present(email)
     return user
 
 
@@ -70,80 +221,126 @@ def verify_email(db: Session, token: str) -> None:
     if user:
         user.is_verified = True
         user.is_active = True
+    events.record_event(db, events.EMAIL_VERIFIED, record.user_id)
     db.commit()
+    invalidate_user(record.user_id)
+
+
+def _replica_is_behind(user: User | None, valid: bool) -> bool:
+    if not (valid and user.is_verified and user.is_active):
+        return True
+    return user.session_generation < get_user_generation(user.id)
 
 
 def authenticate_user(db: Session, email: str, password: str) -> User:
-    user = _get_user_by_email(db, email)
-    if not user or not verify_password(password, user.password_hash):
+    # A cached miss was read on the primary and is overwritten by any insert,
+    # so it skips the replica re-check as well as the lookup.
+    known_missing = _email_known_missing(email)
+    user = None if known_missing else _get_user_by_email(db, email)
+    valid = user is not None and verify_password(password, user.password_hash)
+    if not known_missing and reads_from_replica(db) and _replica_is_behind(user, valid):
+        # The replica may not have applied a registration, verification,
+        # password reset or logout-all that just committed; the primary decides.
+        replica_hash = user.password_hash if user else None
+        use_primary(db)
+        user = _get_user_by_email(db, email)
+        if user is not None and user.password_hash != replica_hash:
+            valid = verify_password(password, user.password_hash)
+    if not user:
+        if not known_missing:
+            _remember_missing_email(email)
+        verify_password(password, dummy_password_hash())
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     if not user.is_verified or not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified")
+    password_upgrade.schedule_rehash(user.id, user.password_hash, password)
     return user
 
 
-def _store_refresh_token(db: Session, user: User, refresh_token: str) -> None:
-    payload = decode_token(refresh_token)
-    jti = payload.get("jti")
-    exp = payload.get("exp")
-    if not jti or not exp:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-
-    expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
-    db.add(RefreshToken(user_id=user.id, token_jti=jti, expires_at=expires_at))
+def create_token_pair(db: Session, user: User) -> Tuple[str, str]:
+    extra = session_claims(user.session_generation, get_role_generation(db, user.role))
+    access_token = create_access_token(subject=str(user.id), extra_claims=extra)
+    refresh_token, claims = create_refresh_token(subject=str(user.id), extra_claims=extra)
+    family_id = uuid4()
+    db.execute(_insert_refresh_statement(user.id, family_id, claims))
+    events.record_event(db, events.LOGGED_IN, user.id, family_id=str(family_id))
     db.commit()
-
-    redis = get_redis()
-    ttl = int(expires_at.timestamp() - _now().timestamp())
-    redis.setex(f"{REDIS_REFRESH_PREFIX}{jti}", ttl, str(user.id))
+    get_redis().setex(f"{REDIS_REFRESH_PREFIX}{claims['jti']}", _refresh_ttl(claims), str(user.id))
+    return access_token, refresh_token
 
 
-def create_token_pair(db: Session, user: User) -> Tuple[str, str]:
-    access_token = create_access_token(subject=str(user.id))
-    refresh_token = create_refresh_token(subject=str(user.id))
-    _store_refresh_token(db, user, refresh_token)
-    return access_token, refresh_token
+def _revoke_reused_family(db: Session, jti: str, user_id: str) -> None:
+    family_id = db.scalar(_reused_family_statement(jti))
+    if family_id is None:
+        db.rollback()
+        return
+    revoked = db.scalars(_revoke_family_statement(family_id)).all()
+    events.record_event(
+        db,
+        events.REFRESH_REUSE_DETECTED,
+        user_id,
+        family_id=str(family_id),
+        revoked=len(revoked),
+    )
+    db.commit()
+    if revoked:
+        get_redis().delete(*(f"{REDIS_REFRESH_PREFIX}{token_jti}" for token_jti in revoked))
 
 
 def refresh_tokens(db: Session, refresh_token: str) -> Tuple[str, str]:
-    payload = decode_token(refresh_token)
-    if payload.get("type") != "refresh":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    payload = _decode_refresh_token(refresh_token)
 
     jti = payload.get("jti")
     user_id = payload.get("sub")
     if not jti or not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    redis = get_redis()
-    redis_key = f"{REDIS_REFRESH_PREFIX}{jti}"
-    if not redis.get(redis_key):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
-
-    token_row = db.scalar(
-        select(RefreshToken).where(
-            RefreshToken.token_jti == jti,
-            RefreshToken.revoked_at.is_(None),
-        )
+    extra = session_claims(payload.get("gen", 0), payload.get("rgen", 0))
+    access_token = create_access_token(subject=user_id, extra_claims=extra)
+    new_token, claims = create_refresh_token(subject=user_id, extra_claims=extra)
+    new_key = f"{REDIS_REFRESH_PREFIX}{claims['jti']}"
+
+    successor_key = f"{REDIS_REFRESH_SUCCESSOR_PREFIX}{jti}"
+    rotated = _rotate_script()(
+        keys=[
+            f"{REDIS_REFRESH_PREFIX}{jti}",
+            new_key,
+            f"{REDIS_SESSION_GEN_PREFIX}{user_id}",
+            successor_key,
+        ],
+        args=[
+            _refresh_ttl(claims),
+            extra["gen"],
+            json.dumps(claims),
+            settings.refresh_reuse_grace_seconds,
+        ],
+        client=get_redis(),
     )
-    if not token_row or token_row.expires_at < _now():
+    if not rotated:
+        # Presenting an already rotated token means it leaked: end the whole chain.
+        _revoke_reused_family(db, jti, user_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    if rotated[0] == REPLAYED:
+        # A retry or a second tab: both get the successor the first refresh issued.
+        return access_token, sign_claims(json.loads(rotated[1]))
+
+    consumed = db.execute(_consume_refresh_statement(jti, extra["gen"])).first()
+    if consumed is None or extra["rgen"] != get_role_generation(db, consumed.role):
+        db.rollback()
+        get_redis().delete(new_key, successor_key)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
-
-    token_row.revoked_at = _now()
-    redis.delete(redis_key)
+    db.execute(_insert_refresh_statement(consumed.user_id, consumed.family_id, claims))
+    events.record_event(
+        db, events.TOKEN_REFRESHED, consumed.user_id, family_id=str(consumed.family_id)
+    )
     db.commit()
-
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-
-    return create_token_pair(db, user)
+    return access_token, new_token
 
 
 def logout(db: Session, refresh_token: str) -> None:
-    payload = decode_token(refresh_token)
-    if payload.get("type") != "refresh":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    payload = _decode_refresh_token(refresh_token)
 
     jti = payload.get("jti")
     if not jti:
@@ -152,10 +349,18 @@ def logout(db: Session, refresh_token: str) -> None:
     token_row = db.scalar(select(RefreshToken).where(RefreshToken.token_jti == jti))
     if token_row and token_row.revoked_at is None:
         token_row.revoked_at = _now()
+        events.record_event(
+            db, events.LOGGED_OUT, token_row.user_id, family_id=str(token_row.family_id)
+        )
         db.commit()
 
-    redis = get_redis()
-    redis.delete(f"{REDIS_REFRESH_PREFIX}{jti}")
+    get_redis().delete(f"{REDIS_REFRESH_PREFIX}{jti}")
+
+
+def logout_all(db: Session, user_id: str | UUID) -> None:
+    # Flushed by the commit inside the generation bump, so both land together.
+    events.record_event(db, events.LOGGED_OUT_ALL, user_id)
+    bump_user_generation(db, user_id)
 
 
 def request_password_reset(db: Session, email: str) -> None:
@@ -167,8 +372,9 @@ def request_password_reset(db: Session, email: str) -> None:
     expires_at = _now() + timedelta(minutes=settings.password_reset_minutes)
     reset = PasswordResetToken(user_id=user.id, token=token_value, expires_at=expires_at)
     db.add(reset)
+    enqueue_password_reset_email(db, user.email, token_value)
+    events.record_event(db, events.PASSWORD_RESET_REQUESTED, user.id)
     db.commit()
-    send_password_reset_email(user.email, token_value)
 
 
 def confirm_password_reset(db: Session, token: str, new_password: str) -> None:
@@ -185,15 +391,6 @@ def confirm_password_reset(db: Session, token: str, new_password: str) -> None:
     user = db.get(User, record.user_id)
     if user:
         user.password_hash = hash_password(new_password)
-
-    db.execute(
-        update(RefreshToken)
-        .where(RefreshToken.user_id == record.user_id, RefreshToken.revoked_at.is_(None))
-        .values(revoked_at=_now())
-    )
-    db.commit()
-
-    redis = get_redis()
-    tokens = db.scalars(select(RefreshToken.token_jti).where(RefreshToken.user_id == record.user_id))
-    for jti in tokens:
-        redis.delete(f"{REDIS_REFRESH_PREFIX}{jti}")
+    events.record_event(db, events.PASSWORD_RESET_COMPLETED, record.user_id)
+    # Ends every existing session in the same commit as the new password.
+    bump_user_generation(db, record.user_id)
@@ -0,0 +1,303 @@
+from datetime import timedelta
+from functools import lru_cache
+import json
+import secrets
+from typing import Tuple
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.hashing import hash_password_async, verify_password_async
+from app.core.redis import get_async_redis
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    dummy_password_hash,
+    sign_claims,
+)
+from app.db.models.token import EmailVerificationToken, PasswordResetToken, RefreshToken
+from app.db.models.user import User
+from app.db.session import reads_from_replica, use_primary
+from app.services.auth_service import (
+    EMAIL_MISSING,
+    EMAIL_PRESENT,
+    REDIS_MISSING_EMAIL_PREFIX,
+    REDIS_REFRESH_PREFIX,
+    REDIS_REFRESH_SUCCESSOR_PREFIX,
+    REPLAYED,
+    ROTATE_REFRESH_SCRIPT,
+    _consume_refresh_statement,
+    _decode_refresh_token,
+    _insert_refresh_statement,
+    _now,
+    _refresh_ttl,
+    _reused_family_statement,
+    _revoke_family_statement,
+)
+from app.services import events, password_upgrade
+from app.services.email_service import enqueue_password_reset_email, enqueue_verification_email
+from app.services.sessions import (
+    REDIS_SESSION_GEN_PREFIX,
+    bump_user_generation_async,
+    get_role_generation_async,
+    get_user_generation_async,
+    session_claims,
+)
+from app.services.user_cache import invalidate_user_async
+
+
+@lru_cache(maxsize=1)
+def _rotate_script():
+    return get_async_redis().register_script(ROTATE_REFRESH_SCRIPT)
+
+
+async def _get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    return await db.scalar(
+        select(User).where(User.email == email).execution_options(populate_existing=True)
+    )
+
+
+async def _email_known_missing(email: str) -> bool:
+    return await get_async_redis().get(f"{REDIS_MISSING_EMAIL_PREFIX}{email}") == EMAIL_MISSING
+
+
+async def _remember_missing_email(email: str) -> None:
+    await get_async_redis().set(
+        f"{REDIS_MISSING_EMAIL_PREFIX}{email}",
+        EMAIL_MISSING,
+        ex=settings.missing_email_cache_ttl_seconds,
+        nx=True,
+    )
+
+
+async def mark_emails_present(*emails: str) -> None:
+    if not emails:
+        return
+    pipe = get_async_redis().pipeline(transaction=False)
+    for email in emails:
+        pipe.set(
+            f"{REDIS_MISSING_EMAIL_PREFIX}{email}",
+            EMAIL_PRESENT,
+            ex=settings.missing_email_cache_ttl_seconds,
+        )
+    await pipe.execute()
+
+
+async def register_user(db: AsyncSession, email: str, password: str) -> User:
+    existing = await _get_user_by_email(db, email)
+    if existing:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+
+    user = User(
+        email=email,
+        password_hash=await hash_password_async(password),
+        is_active=False,
+        is_verified=False,
+    )
+    db.add(user)
+    await db.flush()
+
+    token_value = secrets.token_urlsafe(32)
+    expires_at = _now() + timedelta(minutes=settings.email_verification_minutes)
+    verification = EmailVerificationToken(user_id=user.id, token=token_value, expires_at=expires_at)
+    db.add(verification)
+    enqueue_verification_email(db, user.email, token_value)
+    events.record_event(db, events.USER_REGISTERED, user.id, email=user.email)
+    await db.commit()
+    await db.refresh(user)
+    await mark_emails_present(email)
+    return user
+
+
+async def verify_email(db: AsyncSession, token: str) -> None:
+    record = await db.scalar(
+        select(EmailVerificationToken).where(
+            EmailVerificationToken.token == token,
+            EmailVerificationToken.used_at.is_(None),
+        )
+    )
+    if not record or record.expires_at < _now():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
+
+    record.used_at = _now()
+    user = await db.get(User, record.user_id)
+    if user:
+        user.is_verified = True
+        user.is_active = True
+    events.record_event(db, events.EMAIL_VERIFIED, record.user_id)
+    await db.commit()
+    await invalidate_user_async(record.user_id)
+
+
+async def _replica_is_behind(user: User | None, valid: bool) -> bool:
+    if not (valid and user.is_verified and user.is_active):
+        return True
+    return user.session_generation < await get_user_generation_async(user.id)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
+    known_missing = await _email_known_missing(email)
+    user = None if known_missing else await _get_user_by_email(db, email)
+    valid = user is not None and await verify_password_async(password, user.password_hash)
+    if (
+        not known_missing
+        and reads_from_replica(db)
+        and await _replica_is_behind(user, valid)
+    ):
+        replica_hash = user.password_hash if user else None
+        use_primary(db)
+        user = await _get_user_by_email(db, email)
+        if user is not None and user.password_hash != replica_hash:
+            valid = await verify_password_async(password, user.password_hash)
+    if not user:
+        if not known_missing:
+            await _remember_missing_email(email)
+        await verify_password_async(password, dummy_password_hash())
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if not user.is_verified or not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified")
+    password_upgrade.schedule_rehash(user.id, user.password_hash, password)
+    return user
+
+
+async def create_token_pair(db: AsyncSession, user: User) -> Tuple[str, str]:
+    extra = session_claims(user.session_generation, await get_role_generation_async(db, user.role))
+    access_token = create_access_token(subject=str(user.id), extra_claims=extra)
+    refresh_token, claims = create_refresh_token(subject=str(user.id), extra_claims=extra)
+    family_id = uuid4()
+    await db.execute(_insert_refresh_statement(user.id, family_id, claims))
+    events.record_event(db, events.LOGGED_IN, user.id, family_id=str(family_id))
+    await db.commit()
+    await get_async_redis().setex(
+        f"{REDIS_REFRESH_PREFIX}{claims['jti']}", _refresh_ttl(claims), str(user.id)
+    )
+    return access_token, refresh_token
+
+
+async def _revoke_reused_family(db: AsyncSession, jti: str, user_id: str) -> None:
+    family_id = await db.scalar(_reused_family_statement(jti))
+    if family_id is None:
+        await db.rollback()
+        return
+    revoked = (await db.scalars(_revoke_family_statement(family_id))).all()
+    events.record_event(
+        db,
+        events.REFRESH_REUSE_DETECTED,
+        user_id,
+        family_id=str(family_id),
+        revoked=len(revoked),
+    )
+    await db.commit()
+    if revoked:
+        await get_async_redis().delete(
+            *(f"{REDIS_REFRESH_PREFIX}{token_jti}" for token_jti in revoked)
+        )
+
+
+async def refresh_tokens(db: AsyncSession, refresh_token: str) -> Tuple[str, str]:
+    payload = _decode_refresh_token(refresh_token)
+
+    jti = payload.get("jti")
+    user_id = payload.get("sub")
+    if not jti or not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    extra = session_claims(payload.get("gen", 0), payload.get("rgen", 0))
+    access_token = create_access_token(subject=user_id, extra_claims=extra)
+    new_token, claims = create_refresh_token(subject=user_id, extra_claims=extra)
+    new_key = f"{REDIS_REFRESH_PREFIX}{claims['jti']}"
+
+    successor_key = f"{REDIS_REFRESH_SUCCESSOR_PREFIX}{jti}"
+    rotated = await _rotate_script()(
+        keys=[
+            f"{REDIS_REFRESH_PREFIX}{jti}",
+            new_key,
+            f"{REDIS_SESSION_GEN_PREFIX}{user_id}",
+            successor_key,
+        ],
+        args=[
+            _refresh_ttl(claims),
+            extra["gen"],
+            json.dumps(claims),
+            settings.refresh_reuse_grace_seconds,
+        ],
+        client=get_async_redis(),
+    )
+    if not rotated:
+        await _revoke_reused_family(db, jti, user_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    if rotated[0] == REPLAYED:
+        return access_token, sign_claims(json.loads(rotated[1]))
+
+    consumed = (await db.execute(_consume_refresh_statement(jti, extra["gen"]))).first()
+    if consumed is None or extra["rgen"] != await get_role_generation_async(db, consumed.role):
+        await db.rollback()
+        await get_async_redis().delete(new_key, successor_key)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
+    await db.execute(_insert_refresh_statement(consumed.user_id, consumed.family_id, claims))
+    events.record_event(
+        db, events.TOKEN_REFRESHED, consumed.user_id, family_id=str(consumed.family_id)
+    )
+    await db.commit()
+    return access_token, new_token
+
+
+async def logout(db: AsyncSession, refresh_token: str) -> None:
+    payload = _decode_refresh_token(refresh_token)
+
+    jti = payload.get("jti")
+    if not jti:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    token_row = await db.scalar(select(RefreshToken).where(RefreshToken.token_jti == jti))
+    if token_row and token_row.revoked_at is None:
+        token_row.revoked_at = _now()
+        events.record_event(
+            db, events.LOGGED_OUT, token_row.user_id, family_id=str(token_row.family_id)
+        )
+        await db.commit()
+
+    await get_async_redis().delete(f"{REDIS_REFRESH_PREFIX}{jti}")
+
+
+async def logout_all(db: AsyncSession, user_id: str | UUID) -> None:
+    # Flushed by the commit inside the generation bump, so both land together.
+    events.record_event(db, events.LOGGED_OUT_ALL, user_id)
+    await bump_user_generation_async(db, user_id)
+
+
+async def request_password_reset(db: AsyncSession, email: str) -> None:
+    user = await _get_user_by_email(db, email)
+    if not user:
+        return
+
+    token_value = secrets.token_urlsafe(32)
+    expires_at = _now() + timedelta(minutes=settings.password_reset_minutes)
+    reset = PasswordResetToken(user_id=user.id, token=token_value, expires_at=expires_at)
+    db.add(reset)
+    enqueue_password_reset_email(db, user.email, token_value)
+    events.record_event(db, events.PASSWORD_RESET_REQUESTED, user.id)
+    await db.commit()
+
+
+async def confirm_password_reset(db: AsyncSession, token: str, new_password: str) -> None:
+    record = await db.scalar(
+        select(PasswordResetToken).where(
+            PasswordResetToken.token == token,
+            PasswordResetToken.used_at.is_(None),
+        )
+    )
+    if not record or record.expires_at < _now():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
+
+    record.used_at = _now()
+    user = await db.get(User, record.user_id)
+    if user:
+        user.password_hash = await hash_password_async(new_password)
+    events.record_event(db, events.PASSWORD_RESET_COMPLETED, record.user_id)
+    await bump_user_generation_async(db, record.user_id)
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+import logging
+import smtplib
+import threading
+from typing import Dict, List
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.email import EmailOutbox
+from app.db.session import SessionLocal
+from app.services.email_service import LogBackend, SmtpBackend, get_backend
+
+logger = logging.getLogger("auth.email")
+
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claim_statement(batch_size: int):
+    # SKIP LOCKED lets any number of workers claim disjoint batches. The locks
+    # only last for the claim itself: claiming pushes next_attempt_at out by
+    # EMAIL_CLAIM_LEASE_SECONDS, so a worker that dies mid-batch leaves its
+    # unsent rows to be claimed again once the lease runs out.
+    return (
+        select(EmailOutbox)
+        .where(
+            EmailOutbox.sent_at.is_(None),
+            EmailOutbox.dead_at.is_(None),
+            EmailOutbox.next_attempt_at <= _now(),
+        )
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = settings.email_retry_base_seconds * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, MAX_RETRY_DELAY_SECONDS))
+
+
+def _is_permanent(exc: Exception) -> bool:
+    # 5xx replies are permanent; anything else is retried with backoff.
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def claim_batch(db: Session, batch_size: int) -> List[EmailOutbox]:
+    records = db.scalars(_claim_statement(batch_size)).all()
+    lease_until = _now() + timedelta(seconds=settings.email_claim_lease_seconds)
+    for record in records:
+        record.attempts += 1
+        record.next_attempt_at = lease_until
+    db.flush()
+    # Detached, so the committed rows keep their loaded values for sending.
+    db.expunge_all()
+    db.commit()
+    return list(records)
+
+
+def _finish(db: Session, record: EmailOutbox, **values) -> None:
+    db.execute(update(EmailOutbox).where(EmailOutbox.id == record.id).values(**values))
+    db.commit()
+
+
+def deliver_batch(
+    db: Session, backend: LogBackend | SmtpBackend, batch_size: int
+) -> Dict[str, int]:
+    # Nothing is locked or left open while messages go out: each outcome is
+    # committed on its own right after its send, so an error part-way through
+    # never rolls back (and re-sends) the messages already delivered.
+    stats = {"sent": 0, "retried": 0, "dead": 0}
+    for record in claim_batch(db, batch_size):
+        try:
+            backend.send(record)
+        except (smtplib.SMTPException, OSError) as exc:
+            last_error = str(exc)[:1000]
+            if not _is_permanent(exc) and record.attempts < settings.email_max_attempts:
+                _finish(
+                    db,
+                    record,
+                    last_error=last_error,
+                    next_attempt_at=_now() + _retry_delay(record.attempts),
+                )
+                stats["retried"] += 1
+                continue
+            _finish(db, record, last_error=last_error, dead_at=_now())
+            logger.warning("Email %s to %s dead-lettered: %s", record.id, record.recipient, exc)
+            stats["dead"] += 1
+            continue
+        _finish(db, record, sent_at=_now())
+        stats["sent"] += 1
+    return stats
+
+
+def queue_stats(db: Session) -> Dict[str, float]:
+    pending = (EmailOutbox.sent_at.is_(None), EmailOutbox.dead_at.is_(None))
+    count, oldest = db.execute(
+        select(func.count(), func.min(EmailOutbox.created_at)).where(*pending)
+    ).one()
+    return {
+        "pending": count,
+        "dead": db.scalar(select(func.count()).where(EmailOutbox.dead_at.is_not(None))),
+        "lag_seconds": (_now() - oldest).total_seconds() if oldest else 0.0,
+    }
+
+
+def requeue_dead(db: Session) -> int:
+    result = db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.dead_at.is_not(None))
+        .values(dead_at=None, attempts=0, last_error=None, next_attempt_at=_now())
+    )
+    db.commit()
+    return result.rowcount
+
+
+def run_worker(stop: threading.Event) -> None:
+    # Drains full batches back to back and only sleeps once a batch comes
+    # back short, i.e. the queue is empty.
+    backend = get_backend()
+    try:
+        while not stop.is_set():
+            try:
+                with SessionLocal() as db:
+                    stats = deliver_batch(db, backend, settings.email_batch_size)
+            except Exception:
+                logger.exception("Email delivery batch failed")
+                stats = {}
+            if sum(stats.values()) < settings.email_batch_size:
+                stop.wait(settings.email_poll_interval_seconds)
+    finally:
+        backend.close()
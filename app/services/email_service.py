@@ -1,12 +1,97 @@
+from email.message import EmailMessage
 import logging
+import smtplib
 
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.email import EmailOutbox
 
 logger = logging.getLogger("auth.email")
 
+VERIFICATION = "verification"
+PASSWORD_RESET = "password_reset"
+
+SUBJECTS = {
+    VERIFICATION: "Verify your email",
+    PASSWORD_RESET: "Reset your password",
+}
+BODIES = {
+    VERIFICATION: "Use this token to verify your email address: {token}\n",
+    PASSWORD_RESET: "Use this token to reset your password: {token}\n",
+}
+LOG_LINES = {
+    VERIFICATION: "Verify email for %s with token: %s",
+    PASSWORD_RESET: "Password reset for %s with token: %s",
+}
+
+
+# Both take any Session or AsyncSession: the row is only added, and is sent
+# by the outbox worker once the caller's transaction commits.
+def enqueue_verification_email(db: Session, email: str, token: str) -> None:
+    db.add(EmailOutbox(kind=VERIFICATION, recipient=email, token=token))
+
+
+def enqueue_password_reset_email(db: Session, email: str, token: str) -> None:
+    db.add(EmailOutbox(kind=PASSWORD_RESET, recipient=email, token=token))
+
+
+def build_message(record: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.email_from
+    message["To"] = record.recipient
+    message["Subject"] = SUBJECTS[record.kind]
+    message.set_content(BODIES[record.kind].format(token=record.token))
+    return message
+
+
+class LogBackend:
+    def send(self, record: EmailOutbox) -> None:
+        logger.info(LOG_LINES[record.kind], record.recipient, record.token)
+
+    def close(self) -> None:
+        pass
+
+
+class SmtpBackend:
+    # One connection per worker, reused across messages and batches and
+    # reopened when the server has dropped it. Not thread-safe.
+    def __init__(self) -> None:
+        self._client: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        client = smtplib.SMTP(
+            settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout_seconds
+        )
+        if settings.smtp_starttls:
+            client.starttls()
+        if settings.smtp_username:
+            client.login(settings.smtp_username, settings.smtp_password or "")
+        return client
+
+    def send(self, record: EmailOutbox) -> None:
+        message = build_message(record)
+        for reconnect in (False, True):
+            if self._client is None:
+                self._client = self._connect()
+            try:
+                self._client.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._client = None
+                if reconnect:
+                    raise
 
-def send_verification_email(email: str, token: str) -> None:
-    logger.info("Verify email for %s with token: %s", email, token)
+    def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.quit()
+            except (smtplib.SMTPException, OSError):
+                client.close()
 
 
-def send_password_reset_email(email: str, token: str) -> None:
-    logger.info("Password reset for %s with token: %s", email, token)
+def get_backend() -> LogBackend | SmtpBackend:
+    if settings.email_backend == "smtp":
+        return SmtpBackend()
+    return LogBackend()
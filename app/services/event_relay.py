@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+import redis
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.models.event import DomainEvent
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("auth.events")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def consumer_groups() -> List[str]:
+    return [group.strip() for group in settings.events_consumer_groups.split(",") if group.strip()]
+
+
+def _unpublished_statement(batch_size: int):
+    # SKIP LOCKED lets several relays run; each publishes a disjoint batch.
+    return (
+        select(
+            DomainEvent.id,
+            DomainEvent.event_type,
+            DomainEvent.user_id,
+            DomainEvent.data,
+            DomainEvent.created_at,
+        )
+        .where(DomainEvent.published_at.is_(None))
+        .order_by(DomainEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _stream_fields(event: Row) -> Dict[str, str]:
+    return {
+        "event_id": str(event.id),
+        "type": event.event_type,
+        "user_id": str(event.user_id) if event.user_id else "",
+        "data": json.dumps(event.data),
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def ensure_consumer_groups(client: redis.Redis) -> None:
+    # Groups start at 0, so events published before a consumer first
+    # connects are still delivered to it.
+    for group in consumer_groups():
+        try:
+            client.xgroup_create(settings.events_stream, group, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+
+def _stream_id(entry_id: str) -> tuple[int, int]:
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def _retained_from(client: redis.Redis) -> str | None:
+    # The oldest entry some group may still need: its oldest unacknowledged
+    # entry, or else its last delivered one. Every group on the stream counts,
+    # including ones no longer configured (drop those with XGROUP DESTROY).
+    floors = []
+    for group in client.xinfo_groups(settings.events_stream):
+        if group["pending"]:
+            floors.append(client.xpending(settings.events_stream, group["name"])["min"])
+        else:
+            floors.append(group["last-delivered-id"])
+    return min(floors, key=_stream_id) if floors else None
+
+
+def trim_stream(client: redis.Redis, approximate: bool = True) -> None:
+    retained_from = _retained_from(client)
+    if retained_from is not None:
+        client.xtrim(settings.events_stream, minid=retained_from, approximate=approximate)
+
+
+def relay_batch(db: Session, client: redis.Redis, batch_size: int) -> int:
+    # XADDs go out in one pipeline before the rows are marked published. A
+    # crash in between republishes the batch, so delivery is at-least-once
+    # and consumers dedupe on event_id.
+    events = db.execute(_unpublished_statement(batch_size)).all()
+    if not events:
+        db.commit()
+        return 0
+    pipeline = client.pipeline(transaction=False)
+    for event in events:
+        # EVENTS_STREAM_MAXLEN is a hard cap: past it, entries a slow group
+        # has not read yet are dropped.
+        pipeline.xadd(
+            settings.events_stream,
+            _stream_fields(event),
+            maxlen=settings.events_stream_maxlen or None,
+            approximate=True,
+        )
+    pipeline.execute()
+    db.execute(
+        update(DomainEvent)
+        .where(DomainEvent.id.in_([event.id for event in events]))
+        .values(published_at=_now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    trim_stream(client)
+    return len(events)
+
+
+def consume(
+    client: redis.Redis,
+    group: str,
+    consumer: str,
+    handler: Callable[[List[Dict[str, Any]]], None],
+    count: int = 100,
+    block_ms: int = 1000,
+    min_idle_ms: int = 60_000,
+) -> int:
+    # Entries another consumer read but never acknowledged are reclaimed
+    # first, then new ones are read. Nothing is acked until handler returns.
+    entries = client.xautoclaim(
+        settings.events_stream, group, consumer, min_idle_ms, start_id="0-0", count=count
+    )[1]
+    if not entries:
+        response = client.xreadgroup(
+            group, consumer, {settings.events_stream: ">"}, count=count, block=block_ms
+        )
+        entries = response[0][1] if response else []
+    if not entries:
+        return 0
+    handler([fields for _, fields in entries])
+    client.xack(settings.events_stream, group, *(entry_id for entry_id, _ in entries))
+    return len(entries)
+
+
+def run_relay(stop: threading.Event) -> None:
+    client = get_redis()
+    groups_ready = False
+    while not stop.is_set():
+        try:
+            if not groups_ready:
+                ensure_consumer_groups(client)
+                groups_ready = True
+            with SessionLocal() as db:
+                published = relay_batch(db, client, settings.events_batch_size)
+        except Exception:
+            logger.exception("Event relay batch failed")
+            published = 0
+        if published < settings.events_batch_size:
+            stop.wait(settings.events_poll_interval_seconds)
@@ -0,0 +1,24 @@
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.db.models.event import DomainEvent
+
+USER_REGISTERED = "user.registered"
+EMAIL_VERIFIED = "user.email_verified"
+LOGGED_IN = "session.logged_in"
+TOKEN_REFRESHED = "session.refreshed"
+REFRESH_REUSE_DETECTED = "session.refresh_reuse_detected"
+LOGGED_OUT = "session.logged_out"
+LOGGED_OUT_ALL = "session.logged_out_all"
+PASSWORD_RESET_REQUESTED = "password.reset_requested"
+PASSWORD_RESET_COMPLETED = "password.reset_completed"
+
+
+# Takes a Session or an AsyncSession. The row is flushed with the caller's
+# own statements and commits or rolls back with them; the relay publishes it.
+def record_event(db: Session, event_type: str, user_id: str | UUID | None, **data: Any) -> None:
+    if isinstance(user_id, str):
+        user_id = UUID(user_id)
+    db.add(DomainEvent(event_type=event_type, user_id=user_id, data=data))
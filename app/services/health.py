@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import Engine, text
+
+from app.core.config import settings
+from app.core.hashing import hash_executor
+from app.core.redis import get_redis
+from app.core.redis import pool_stats as redis_pool_stats
+from app.db.pool import pool_stats
+from app.db.session import async_engine, engine
+
+logger = logging.getLogger("auth.health")
+
+
+def _check_database() -> Dict[str, Any]:
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as exc:
+        return {"ok": False, "error": type(exc).__name__}
+    return {"ok": True}
+
+
+def _check_redis() -> Dict[str, Any]:
+    try:
+        get_redis().ping()
+    except Exception as exc:
+        return {"ok": False, "error": type(exc).__name__}
+    return {"ok": True}
+
+
+def _saturation(in_use: int, capacity: int) -> Dict[str, Any]:
+    return {
+        "ok": in_use < capacity * settings.health_saturation,
+        "in_use": in_use,
+        "capacity": capacity,
+    }
+
+
+def _check_database_pool(pool_engine: Engine) -> Dict[str, Any]:
+    stats = pool_stats(pool_engine)
+    if "size" not in stats:
+        # NullPool behind PgBouncer: saturation shows up in PgBouncer instead.
+        return {"ok": True}
+    return _saturation(stats["checked_out"], stats["size"] + stats["max_overflow"])
+
+
+def run_checks() -> Dict[str, Dict[str, Any]]:
+    checks = {
+        "database": _check_database(),
+        "redis": _check_redis(),
+        "database_pool": _check_database_pool(engine),
+        "hashing": _saturation(hash_executor.pending, hash_executor.max_pending),
+    }
+    if settings.async_mode:
+        checks["database_pool_async"] = _check_database_pool(async_engine.sync_engine)
+    for client, stats in redis_pool_stats().items():
+        checks[f"redis_pool_{client}"] = _saturation(
+            stats["in_use"], settings.redis_max_connections
+        )
+    return checks
+
+
+class HealthMonitor:
+    # Checks run on a background thread and probes read the last result, so a
+    # probe never touches Postgres or Redis and costs no more than a dict read.
+    def __init__(self) -> None:
+        self._status: Dict[str, Any] = {"ready": False, "checks": {}}
+        self._checked_at: float | None = None
+
+    def check(self) -> None:
+        checks = run_checks()
+        ready = all(check["ok"] for check in checks.values())
+        if not ready and self._status["ready"]:
+            failing = [name for name, check in checks.items() if not check["ok"]]
+            logger.warning("Not ready: %s", ", ".join(failing))
+        self._status = {"ready": ready, "checks": checks}
+        self._checked_at = time.monotonic()
+
+    def monitor(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Health check failed")
+            stop.wait(settings.health_check_interval_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        status, checked_at = self._status, self._checked_at
+        if checked_at is None:
+            return {**status, "ready": False, "reason": "starting"}
+        age = time.monotonic() - checked_at
+        # A hung check (say, waiting on a full pool) must not leave a stale "ready".
+        if age > settings.health_check_interval_seconds * 3 + 1:
+            return {**status, "ready": False, "reason": "stale", "age_seconds": age}
+        return {**status, "age_seconds": age}
+
+
+health_monitor = HealthMonitor()
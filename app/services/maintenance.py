@@ -0,0 +1,290 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import logging
+import re
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.email import EmailOutbox
+from app.db.models.event import DomainEvent
+from app.db.models.token import EmailVerificationToken, PasswordResetToken, RefreshToken
+from app.db.session import engine
+
+logger = logging.getLogger("auth.maintenance")
+
+LOCK_RETRIES = 5
+
+# pg_try_advisory_lock keys, so only one worker or CLI run reaps, and one
+# manages partitions, at a time.
+REAPER_LOCK_KEY = 7_310_112_211
+PARTITION_LOCK_KEY = 7_310_112_212
+PARTITION_PREFIX = "refresh_tokens_p"
+DEFAULT_PARTITION = "refresh_tokens_default"
+PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+# (model, column): rows whose column is older than now are deleted. Refresh
+# rows are kept until they expire even when revoked, because reuse detection
+# needs the revoked row for as long as the token itself would be accepted.
+PURGE_TARGETS = [
+    (RefreshToken, "expires_at"),
+    (EmailVerificationToken, "expires_at"),
+    (EmailVerificationToken, "used_at"),
+    (PasswordResetToken, "expires_at"),
+    (PasswordResetToken, "used_at"),
+    (EmailOutbox, "sent_at"),
+    (DomainEvent, "published_at"),
+]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _month_start(value: datetime, offset: int = 0) -> datetime:
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _set_lock_timeout(db: Session) -> None:
+    db.execute(text(f"SET LOCAL lock_timeout = {int(settings.maintenance_lock_timeout_ms)}"))
+
+
+def purge(
+    db: Session,
+    model,
+    column_name: str,
+    cutoff: datetime,
+    batch_size: int,
+    pause_seconds: float,
+) -> int:
+    # Keyset-paginated on (column, id): every batch is a short transaction with
+    # a bounded lock wait, and the scan resumes where the last batch ended.
+    column = getattr(model, column_name)
+    deleted = 0
+    failures = 0
+    after = None
+    while True:
+        query = select(column, model.id).where(column < cutoff)
+        if after is not None:
+            query = query.where(tuple_(column, model.id) > after)
+        try:
+            _set_lock_timeout(db)
+            rows = db.execute(query.order_by(column, model.id).limit(batch_size)).all()
+            if not rows:
+                db.commit()
+                return deleted
+            # The range on the keyset column lets Postgres prune partitions.
+            db.execute(
+                delete(model)
+                .where(
+                    column.between(rows[0][0], rows[-1][0]),
+                    model.id.in_([row[1] for row in rows]),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except OperationalError:
+            db.rollback()
+            failures += 1
+            if failures > LOCK_RETRIES:
+                raise
+            logger.warning("Lock timeout purging %s; backing off", model.__tablename__)
+            time.sleep(max(pause_seconds, 0.01) * 20 * failures)
+            continue
+        failures = 0
+        deleted += len(rows)
+        after = tuple(rows[-1])
+        time.sleep(pause_seconds)
+
+
+def _months_ahead() -> int:
+    # Far enough ahead that a refresh token minted now never lands in the
+    # default partition, whatever REFRESH_TOKEN_PARTITIONS_AHEAD says.
+    now = _now()
+    last = _month_start(now + timedelta(days=settings.refresh_token_days))
+    needed = (last.year - now.year) * 12 + last.month - now.month + 1
+    return max(settings.refresh_token_partitions_ahead, needed)
+
+
+def _create_partition(db: Session, name: str, start: datetime, end: datetime) -> int:
+    # Postgres refuses to attach a range the default partition holds rows for,
+    # so those rows move out and back in within the same transaction. Locking
+    # the default partition first keeps new rows for the range from arriving
+    # in between. Returns the number of rows moved.
+    bounds = {"start": start, "end": end}
+    _set_lock_timeout(db)
+    db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+    db.execute(
+        text("CREATE TEMP TABLE refresh_tokens_moving (LIKE refresh_tokens) ON COMMIT DROP")
+    )
+    moved = db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE expires_at >= :start AND expires_at < :end RETURNING *) "
+            "INSERT INTO refresh_tokens_moving SELECT * FROM moved"
+        ),
+        bounds,
+    ).rowcount
+    db.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF refresh_tokens "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+    if moved:
+        db.execute(text("INSERT INTO refresh_tokens SELECT * FROM refresh_tokens_moving"))
+    db.commit()
+    return moved
+
+
+def ensure_refresh_token_partitions(db: Session, months_ahead: int) -> List[str]:
+    created = []
+    existing = set(_partition_names(db))
+    for offset in range(months_ahead + 1):
+        start = _month_start(_now(), offset)
+        name = f"{PARTITION_PREFIX}{start:%Y%m}"
+        if name in existing:
+            continue
+        try:
+            moved = _create_partition(db, name, start, _month_start(start, 1))
+        except DBAPIError:
+            db.rollback()
+            logger.warning("Could not create partition %s", name, exc_info=True)
+            continue
+        if moved:
+            logger.info("Moved %s rows from %s into %s", moved, DEFAULT_PARTITION, name)
+        created.append(name)
+    return created
+
+
+def purge_default_partition(db: Session) -> int:
+    # Only rows older than the first monthly partition (or minted with a
+    # longer REFRESH_TOKEN_DAYS) end up here; dropping partitions never
+    # reaches them.
+    try:
+        _set_lock_timeout(db)
+        deleted = db.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE expires_at < :now"), {"now": _now()}
+        ).rowcount
+        db.commit()
+    except DBAPIError:
+        db.rollback()
+        logger.warning("Could not purge %s", DEFAULT_PARTITION, exc_info=True)
+        return 0
+    return deleted
+
+
+def drop_expired_partitions(db: Session) -> List[str]:
+    # A monthly partition only holds tokens that expire within that month, so
+    # once the month is over the whole partition can go in one DROP.
+    dropped = []
+    current = _month_start(_now())
+    for name in _partition_names(db):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        start = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+        if _month_start(start, 1) > current:
+            continue
+        try:
+            _set_lock_timeout(db)
+            db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+        except DBAPIError:
+            db.rollback()
+            logger.warning("Could not drop partition %s", name, exc_info=True)
+            continue
+        dropped.append(name)
+    return dropped
+
+
+def _partition_names(db: Session) -> List[str]:
+    return list(
+        db.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'refresh_tokens'::regclass ORDER BY c.relname"
+            )
+        )
+    )
+
+
+def run_partition_maintenance() -> Dict[str, int] | None:
+    # Runs in every app process whether or not the reaper is enabled: without
+    # it, inserts fall into the default partition once the months created by
+    # the migration have passed.
+    if engine.dialect.name != "postgresql":
+        return None
+    with engine.connect() as connection:
+        locked = connection.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": PARTITION_LOCK_KEY}
+        )
+        connection.commit()
+        if not locked:
+            return None
+        try:
+            with Session(bind=connection) as db:
+                return {
+                    "partitions_created": len(
+                        ensure_refresh_token_partitions(db, _months_ahead())
+                    ),
+                    "partitions_dropped": len(drop_expired_partitions(db)),
+                    "default_partition_purged": purge_default_partition(db),
+                }
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PARTITION_LOCK_KEY})
+            connection.commit()
+
+
+def run_partition_manager(stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            stats = run_partition_maintenance()
+            if stats and any(stats.values()):
+                logger.info("Partition maintenance finished: %s", stats)
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        stop.wait(settings.refresh_token_partition_interval_seconds)
+
+
+def run_maintenance(
+    batch_size: int | None = None, pause_seconds: float | None = None
+) -> Dict[str, int] | None:
+    batch_size = batch_size or settings.maintenance_batch_size
+    if pause_seconds is None:
+        pause_seconds = settings.maintenance_batch_pause_seconds
+    partition_stats = run_partition_maintenance()
+    with engine.connect() as connection:
+        locked = connection.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": REAPER_LOCK_KEY}
+        )
+        connection.commit()
+        if not locked:
+            logger.info("Another reaper holds the lock; skipping")
+            return None
+        try:
+            with Session(bind=connection) as db:
+                stats: Dict[str, int] = dict(partition_stats or {})
+                for model, column_name in PURGE_TARGETS:
+                    key = f"{model.__tablename__}.{column_name}"
+                    stats[key] = purge(db, model, column_name, _now(), batch_size, pause_seconds)
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REAPER_LOCK_KEY})
+            connection.commit()
+    logger.info("Maintenance finished: %s", stats)
+    return stats
+
+
+async def run_periodically(interval_seconds: int) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance)
+        except Exception:
+            logger.exception("Maintenance run failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.core import security
+from app.core.config import settings
+from app.core.hashing import hash_executor
+from app.db.models.user import User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("auth.hashing")
+
+# One thread, so at most one rehash holds a hash pool worker at a time and
+# rehashing never crowds out logins.
+_rehashes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+_in_flight: set[UUID] = set()
+_lock = threading.Lock()
+
+
+def schedule_rehash(user_id: UUID, password_hash: str, password: str) -> None:
+    # Called with the password a login just verified. The new hash is made
+    # and stored after the response, off the request path.
+    if not security.pwd_context.needs_update(password_hash):
+        return
+    with _lock:
+        if user_id in _in_flight or len(_in_flight) >= settings.hash_max_pending:
+            return
+        _in_flight.add(user_id)
+    _rehashes.submit(_rehash, user_id, password_hash, password)
+
+
+def _rehash(user_id: UUID, old_hash: str, password: str) -> None:
+    try:
+        new_hash = hash_executor.submit(security.hash_password, password).result()
+        with SessionLocal() as db:
+            # Only replaces the hash that was verified, so a password reset
+            # committed in the meantime wins.
+            db.execute(
+                update(User)
+                .where(User.id == user_id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+    except HTTPException:
+        # The hash pool is saturated; the next login tries again.
+        pass
+    except Exception:
+        logger.exception("Rehashing the password of user %s failed", user_id)
+    finally:
+        with _lock:
+            _in_flight.discard(user_id)
+
+
+def shutdown() -> None:
+    _rehashes.shutdown(wait=True, cancel_futures=True)
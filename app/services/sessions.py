@@ -0,0 +1,133 @@
+from typing import Any, Dict
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_async_redis, get_redis
+from app.db.models.user import RoleGeneration, User, UserRole
+from app.services.user_cache import invalidate_user, invalidate_user_async
+
+# Tokens carry the user's session generation ("gen") and their role's
+# generation ("rgen") at mint time; bumping either number ends every session
+# minted before it. User generations live in users.session_generation and
+# role generations in role_generations; both are mirrored to Redis. Role
+# generations are read from Redis on every mint and check, so a bump applies
+# on every worker at once; a missing key is reloaded from the database rather
+# than read as 0, so flushing Redis cannot bring revoked sessions back. Every
+# check also reads the user's generation from Redis, so a cached user copy
+# from before a bump cannot keep an old session alive.
+REDIS_SESSION_GEN_PREFIX = "session_gen:"
+REDIS_ROLE_GEN_PREFIX = "session_gen:role:"
+
+
+def session_claims(session_generation: int, role_generation: int) -> Dict[str, Any]:
+    return {"gen": session_generation, "rgen": role_generation}
+
+
+def _bump_user_statement(user_id: str | UUID):
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(session_generation=User.session_generation + 1)
+        .returning(User.session_generation)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _role_generation_statement(role: UserRole):
+    return select(RoleGeneration.generation).where(RoleGeneration.role == role.value)
+
+
+def _load_role_generation(db: Session, role: UserRole) -> int:
+    generation = db.scalar(_role_generation_statement(role)) or 0
+    get_redis().set(f"{REDIS_ROLE_GEN_PREFIX}{role.value}", generation, nx=True)
+    return generation
+
+
+def get_role_generation(db: Session, role: UserRole) -> int:
+    generation = get_redis().get(f"{REDIS_ROLE_GEN_PREFIX}{role.value}")
+    if generation is None:
+        return _load_role_generation(db, role)
+    return int(generation)
+
+
+def get_user_generation(user_id: str | UUID) -> int:
+    return int(get_redis().get(f"{REDIS_SESSION_GEN_PREFIX}{user_id}") or 0)
+
+
+def get_session_generations(db: Session, user_id: str | UUID, role: UserRole) -> tuple[int, int]:
+    # The user's generation and their role's, in one round trip.
+    generation, role_generation = get_redis().mget(
+        f"{REDIS_SESSION_GEN_PREFIX}{user_id}", f"{REDIS_ROLE_GEN_PREFIX}{role.value}"
+    )
+    if role_generation is None:
+        role_generation = _load_role_generation(db, role)
+    return int(generation or 0), int(role_generation)
+
+
+def bump_role_generation(db: Session, role: UserRole) -> int:
+    # Starts past the Redis value too, which is ahead for roles bumped before
+    # generations were stored in the database.
+    key = f"{REDIS_ROLE_GEN_PREFIX}{role.value}"
+    current = db.scalar(
+        select(RoleGeneration).where(RoleGeneration.role == role.value).with_for_update()
+    )
+    if current is None:
+        current = RoleGeneration(role=role.value, generation=0)
+        db.add(current)
+    generation = max(current.generation, int(get_redis().get(key) or 0)) + 1
+    current.generation = generation
+    db.commit()
+    get_redis().set(key, generation)
+    return generation
+
+
+def bump_user_generation(db: Session, user_id: str | UUID) -> int | None:
+    # Commits together with whatever the caller has pending on the session.
+    generation = db.scalar(_bump_user_statement(user_id))
+    db.commit()
+    if generation is None:
+        return None
+    get_redis().set(f"{REDIS_SESSION_GEN_PREFIX}{user_id}", generation)
+    invalidate_user(user_id)
+    return generation
+
+
+async def _load_role_generation_async(db: AsyncSession, role: UserRole) -> int:
+    generation = await db.scalar(_role_generation_statement(role)) or 0
+    await get_async_redis().set(f"{REDIS_ROLE_GEN_PREFIX}{role.value}", generation, nx=True)
+    return generation
+
+
+async def get_role_generation_async(db: AsyncSession, role: UserRole) -> int:
+    generation = await get_async_redis().get(f"{REDIS_ROLE_GEN_PREFIX}{role.value}")
+    if generation is None:
+        return await _load_role_generation_async(db, role)
+    return int(generation)
+
+
+async def get_user_generation_async(user_id: str | UUID) -> int:
+    return int(await get_async_redis().get(f"{REDIS_SESSION_GEN_PREFIX}{user_id}") or 0)
+
+
+async def get_session_generations_async(
+    db: AsyncSession, user_id: str | UUID, role: UserRole
+) -> tuple[int, int]:
+    generation, role_generation = await get_async_redis().mget(
+        f"{REDIS_SESSION_GEN_PREFIX}{user_id}", f"{REDIS_ROLE_GEN_PREFIX}{role.value}"
+    )
+    if role_generation is None:
+        role_generation = await _load_role_generation_async(db, role)
+    return int(generation or 0), int(role_generation)
+
+
+async def bump_user_generation_async(db: AsyncSession, user_id: str | UUID) -> int | None:
+    generation = await db.scalar(_bump_user_statement(user_id))
+    await db.commit()
+    if generation is None:
+        return None
+    await get_async_redis().set(f"{REDIS_SESSION_GEN_PREFIX}{user_id}", generation)
+    await invalidate_user_async(user_id)
+    return generation
@@ -0,0 +1,141 @@
+from collections import deque
+import logging
+import threading
+import time
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.db.models.user import User
+from app.schemas.user import CachedUser
+
+REDIS_USER_PREFIX = "user:"
+
+logger = logging.getLogger("auth.cache")
+
+local_users = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_local_ttl_seconds)
+
+
+def get_cached_user(user_id: str) -> CachedUser | None:
+    user = local_users.get(user_id)
+    if user is not None:
+        return user
+    return get_shared_user(user_id)
+
+
+def get_shared_user(user_id: str) -> CachedUser | None:
+    raw = get_redis().get(f"{REDIS_USER_PREFIX}{user_id}")
+    if raw is None:
+        return None
+    user = CachedUser.model_validate_json(raw)
+    local_users.set(user_id, user)
+    return user
+
+
+def cache_user(user: User) -> CachedUser:
+    cached = CachedUser.model_validate(user)
+    get_redis().setex(
+        f"{REDIS_USER_PREFIX}{user.id}", settings.user_cache_ttl_seconds, cached.model_dump_json()
+    )
+    local_users.set(str(user.id), cached)
+    return cached
+
+
+def _delete_cached_user(user_id: str) -> None:
+    local_users.delete(user_id)
+    get_redis().delete(f"{REDIS_USER_PREFIX}{user_id}")
+
+
+class DelayedInvalidator:
+    # One thread for every second delete. The delay is fixed, so the queue is
+    # already in due order; each wake-up deletes everything due in one call.
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self._pending: deque[tuple[float, str]] = deque()
+        self._wakeup = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, user_id: str) -> None:
+        with self._wakeup:
+            self._pending.append((time.monotonic() + self.delay, user_id))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def _due(self) -> list[str]:
+        with self._wakeup:
+            while True:
+                if self._pending:
+                    wait = self._pending[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._wakeup.wait(wait)
+                else:
+                    self._wakeup.wait()
+            now = time.monotonic()
+            due = []
+            while self._pending and self._pending[0][0] <= now:
+                due.append(self._pending.popleft()[1])
+            return due
+
+    def _run(self) -> None:
+        while True:
+            due = self._due()
+            for user_id in due:
+                local_users.delete(user_id)
+            try:
+                get_redis().delete(*(f"{REDIS_USER_PREFIX}{user_id}" for user_id in due))
+            except Exception:
+                # The entries still expire after USER_CACHE_TTL_SECONDS.
+                logger.exception("Delayed user cache invalidation failed")
+
+
+delayed_invalidator = DelayedInvalidator(
+    settings.replica_max_lag_seconds + settings.replica_check_interval_seconds
+)
+
+
+def _invalidate_again_later(user_id: str) -> None:
+    # A request can re-cache the user from a replica that has not applied the
+    # change yet. Replicas further behind than REPLICA_MAX_LAG_SECONDS are not
+    # read from, so a second delete once that has passed drops such a copy.
+    if settings.replica_urls:
+        delayed_invalidator.schedule(user_id)
+
+
+def invalidate_user(user_id: str | UUID) -> None:
+    _delete_cached_user(str(user_id))
+    _invalidate_again_later(str(user_id))
+
+
+async def get_cached_user_async(user_id: str) -> CachedUser | None:
+    user = local_users.get(user_id)
+    if user is not None:
+        return user
+    return await get_shared_user_async(user_id)
+
+
+async def get_shared_user_async(user_id: str) -> CachedUser | None:
+    raw = await get_async_redis().get(f"{REDIS_USER_PREFIX}{user_id}")
+    if raw is None:
+        return None
+    user = CachedUser.model_validate_json(raw)
+    local_users.set(user_id, user)
+    return user
+
+
+async def cache_user_async(user: User) -> CachedUser:
+    cached = CachedUser.model_validate(user)
+    await get_async_redis().setex(
+        f"{REDIS_USER_PREFIX}{user.id}", settings.user_cache_ttl_seconds, cached.model_dump_json()
+    )
+    local_users.set(str(user.id), cached)
+    return cached
+
+
+async def invalidate_user_async(user_id: str | UUID) -> None:
+    local_users.delete(str(user_id))
+    await get_async_redis().delete(f"{REDIS_USER_PREFIX}{user_id}")
+    _invalidate_again_later(str(user_id))
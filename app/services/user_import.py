@@ -0,0 +1,217 @@
+import csv
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+import secrets
+from typing import IO, Any, Dict, Iterator, List, Tuple
+from uuid import uuid4
+
+from psycopg.errors import UniqueViolation
+from psycopg.types.json import Jsonb
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import security
+from app.core.config import settings
+from app.core.hashing import hash_executor
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.schemas.user import UserImportRow
+from app.services.auth_service import mark_emails_present
+from app.services import events
+from app.services.email_service import VERIFICATION
+
+logger = logging.getLogger("auth.import")
+
+USER_COPY_COLUMNS = (
+    "id",
+    "email",
+    "password_hash",
+    "is_active",
+    "is_verified",
+    "role",
+    "session_generation",
+    "created_at",
+    "updated_at",
+)
+VERIFICATION_COPY_COLUMNS = ("id", "user_id", "token", "expires_at", "created_at")
+OUTBOX_COPY_COLUMNS = (
+    "id",
+    "kind",
+    "recipient",
+    "token",
+    "attempts",
+    "next_attempt_at",
+    "created_at",
+)
+EVENT_COPY_COLUMNS = ("event_type", "user_id", "data", "created_at")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def read_rows(stream: IO[str], import_format: str) -> Iterator[Tuple[int, Any]]:
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty cells fall back to the field defaults.
+            yield reader.line_num, {
+                key: value for key, value in record.items() if key and value not in (None, "")
+            }
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def parse_row(record: Any) -> UserImportRow | str:
+    if not isinstance(record, dict):
+        return "Malformed row"
+    try:
+        row = UserImportRow.model_validate(record)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        return f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+    if (row.password is None) == (row.password_hash is None):
+        return "Exactly one of password or password_hash is required"
+    if row.password_hash is not None and not security.pwd_context.identify(row.password_hash):
+        return "password_hash is not in a supported format"
+    return row
+
+
+def _copy(db: Session, table: str, columns: Tuple[str, ...], rows: List[tuple]) -> None:
+    # COPY through the psycopg connection under the session's transaction, so
+    # everything a batch writes commits or rolls back together.
+    cursor = db.connection().connection.cursor()
+    try:
+        with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+    finally:
+        cursor.close()
+
+
+def _load_batch(
+    db: Session,
+    rows: List[Tuple[int, UserImportRow]],
+    hashes: Dict[str, str],
+    send_verification: bool,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    emails = [row.email for _, row in rows]
+    existing = set(db.scalars(select(User.email).where(User.email.in_(emails))))
+    errors = [
+        {"line": line, "email": row.email, "error": "Email already registered"}
+        for line, row in rows
+        if row.email in existing
+    ]
+
+    now = _now()
+    expires_at = now + timedelta(minutes=settings.email_verification_minutes)
+    users, tokens, emails, registered = [], [], [], []
+    for _, row in rows:
+        if row.email in existing:
+            continue
+        user_id = uuid4()
+        password_hash = row.password_hash or hashes[row.email]
+        # Rows imported as verified are active straight away, as after verify_email.
+        users.append(
+            (
+                user_id,
+                row.email,
+                password_hash,
+                row.is_verified,
+                row.is_verified,
+                row.role.value,
+                0,
+                now,
+                now,
+            )
+        )
+        registered.append(
+            (events.USER_REGISTERED, user_id, Jsonb({"email": row.email, "source": "import"}), now)
+        )
+        if not row.is_verified:
+            token = secrets.token_urlsafe(32)
+            tokens.append((uuid4(), user_id, token, expires_at, now))
+            if send_verification:
+                emails.append((uuid4(), VERIFICATION, row.email, token, 0, now, now))
+
+    if users:
+        _copy(db, "users", USER_COPY_COLUMNS, users)
+    if tokens:
+        _copy(db, "email_verification_tokens", VERIFICATION_COPY_COLUMNS, tokens)
+    if emails:
+        _copy(db, "email_outbox", OUTBOX_COPY_COLUMNS, emails)
+    if registered:
+        _copy(db, "domain_events", EVENT_COPY_COLUMNS, registered)
+    db.commit()
+    mark_emails_present(*(user[1] for user in users))
+    return len(users), errors
+
+
+def import_batch(
+    db: Session, rows: List[Tuple[int, UserImportRow]], send_verification: bool = True
+) -> Tuple[int, List[Dict[str, Any]]]:
+    plaintext = [row for _, row in rows if row.password is not None]
+    hashed = hash_executor.map(security.hash_password, [row.password for row in plaintext])
+    hashes = {row.email: value for row, value in zip(plaintext, hashed)}
+
+    try:
+        return _load_batch(db, rows, hashes, send_verification)
+    except UniqueViolation:
+        # A registration committed one of these emails after the existence
+        # check; retry once so the check sees it and reports the row instead.
+        db.rollback()
+        return _load_batch(db, rows, hashes, send_verification)
+
+
+def _batches(
+    rows: Iterator[Tuple[int, Any]], batch_size: int
+) -> Iterator[Tuple[List[Tuple[int, UserImportRow]], List[Dict[str, Any]]]]:
+    batch: List[Tuple[int, UserImportRow]] = []
+    errors: List[Dict[str, Any]] = []
+    seen: set = set()
+    for line, record in rows:
+        row = parse_row(record)
+        if isinstance(row, str):
+            email = record.get("email") if isinstance(record, dict) else None
+            errors.append({"line": line, "email": email, "error": row})
+        elif row.email in seen:
+            errors.append({"line": line, "email": row.email, "error": "Duplicate email in file"})
+        else:
+            seen.add(row.email)
+            batch.append((line, row))
+        if len(batch) + len(errors) >= batch_size:
+            yield batch, errors
+            batch, errors = [], []
+    if batch or errors:
+        yield batch, errors
+
+
+def import_users(
+    stream: IO[str],
+    import_format: str,
+    batch_size: int | None = None,
+    send_verification: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    # Yields one progress event per batch, carrying that batch's row errors,
+    # then a final summary. Each batch is one dedupe query, one round of
+    # hashing on the pool and one transaction of COPYs.
+    totals = {"processed": 0, "created": 0, "failed": 0}
+    with SessionLocal() as db:
+        rows = read_rows(stream, import_format)
+        for batch, errors in _batches(rows, batch_size or settings.import_batch_size):
+            created, load_errors = import_batch(db, batch, send_verification) if batch else (0, [])
+            errors = sorted(errors + load_errors, key=lambda error: error["line"])
+            totals["processed"] += len(batch) + len(errors) - len(load_errors)
+            totals["created"] += created
+            totals["failed"] += len(errors)
+            logger.info("Imported %(created)s of %(processed)s users", totals)
+            yield {**totals, "errors": errors}
+    yield {**totals, "done": True}
@@ -0,0 +1,7 @@
+from uvicorn_worker import UvicornWorker
+
+
+class Worker(UvicornWorker):
+    # Named rather than "auto" so a missing uvloop/httptools fails at boot
+    # instead of silently falling back to asyncio and h11.
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
@@ -0,0 +1,127 @@
+"""Outbox email delivery against a local aiosmtpd stand-in and the configured Postgres.
+
+Queues --messages emails, then drains them with the SMTP backend. The
+stand-in answers --fail-rate of deliveries with a transient 451, so the run
+also exercises retries (backoff is set to zero). Reports throughput, SMTP
+connections opened and queue lag, and exits non-zero unless every message
+was received exactly once:
+
+    python -m benchmarks.email_delivery --messages 2000
+    python -m benchmarks.email_delivery --messages 2000 --fail-rate 0.1 --workers 4
+"""
+
+import argparse
+from collections import Counter
+import random
+import secrets
+import sys
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.db.models.email import EmailOutbox
+from app.db.session import SessionLocal
+from app.services import email_outbox
+from app.services.email_service import VERIFICATION, enqueue_verification_email, get_backend
+
+DOMAIN = "email-bench.example.com"
+
+
+class StandIn:
+    def __init__(self, fail_rate: float) -> None:
+        self.fail_rate = fail_rate
+        self.received: Counter = Counter()
+        self.connections = 0
+        self.rejected = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if random.random() < self.fail_rate:
+            self.rejected += 1
+            return "451 Try again later"
+        for recipient in envelope.rcpt_tos:
+            self.received[recipient] += 1
+        return "250 OK"
+
+
+def enqueue(messages: int) -> None:
+    with SessionLocal() as db:
+        for index in range(messages):
+            enqueue_verification_email(db, f"user{index}@{DOMAIN}", secrets.token_urlsafe(32))
+        db.commit()
+
+
+def drain(stop: threading.Event) -> None:
+    backend = get_backend()
+    try:
+        while not stop.is_set():
+            with SessionLocal() as db:
+                stats = email_outbox.deliver_batch(db, backend, settings.email_batch_size)
+            if not any(stats.values()):
+                return
+    finally:
+        backend.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    stand_in = StandIn(args.fail_rate)
+    controller = Controller(stand_in, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    settings.email_backend = "smtp"
+    settings.smtp_host, settings.smtp_port = "127.0.0.1", args.port
+    settings.smtp_username, settings.smtp_starttls = None, False
+    settings.email_batch_size = args.batch_size
+    settings.email_retry_base_seconds = 0
+    settings.email_max_attempts = 100
+
+    outbox = EmailOutbox.__table__
+    recipients = outbox.c.recipient.like(f"%@{DOMAIN}")
+    try:
+        enqueue(args.messages)
+        with SessionLocal() as db:
+            lag = email_outbox.queue_stats(db)["lag_seconds"]
+        stop = threading.Event()
+        started = time.perf_counter()
+        workers = [threading.Thread(target=drain, args=(stop,)) for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        controller.stop()
+        with SessionLocal() as db:
+            db.execute(delete(outbox).where(outbox.c.kind == VERIFICATION, recipients))
+            db.commit()
+
+    duplicates = sum(1 for count in stand_in.received.values() if count > 1)
+    missing = args.messages - len(stand_in.received)
+    print(
+        f"messages={args.messages} workers={args.workers} elapsed={elapsed:.2f}s "
+        f"rate={args.messages / elapsed:.0f}/s connections={stand_in.connections} "
+        f"transient_failures={stand_in.rejected} lag_before_drain={lag:.2f}s"
+    )
+    if duplicates or missing:
+        print(f"FAIL duplicates={duplicates} missing={missing}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Domain event outbox throughput against the configured Postgres and Redis.
+
+Measures, on a scratch stream:
+
+- the request-path cost of recording an event in a transaction that
+  commits anyway;
+- relay throughput, rows published to the stream per second;
+- consumer-group throughput via event_relay.consume, checking every event
+  arrived at least once. Exits non-zero if any is missing.
+
+Stop other relays first, or they publish the benchmark's rows to the real
+stream. The script refuses to run while real events are waiting to be
+published.
+
+    python -m benchmarks.event_relay --events 50000 --relays 2
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.models.event import DomainEvent
+from app.db.session import SessionLocal
+from app.services import event_relay, events
+
+BENCH_TYPE = "bench.event"
+
+
+def commit_overhead(iterations: int) -> None:
+    # Both variants write one row, standing in for the state change the
+    # request commits anyway; the second also records an event.
+    timings = {}
+    with SessionLocal() as db:
+        for label, rows in (("write", 1), ("write+event", 2)):
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                for _ in range(rows):
+                    events.record_event(db, BENCH_TYPE, None, probe=True)
+                db.commit()
+                samples.append(time.perf_counter() - started)
+            timings[label] = statistics.median(samples) * 1000
+    print(
+        f"request path: commit p50={timings['write']:.3f}ms "
+        f"with event p50={timings['write+event']:.3f}ms "
+        f"(+{timings['write+event'] - timings['write']:.3f}ms)"
+    )
+
+
+def seed(count: int) -> None:
+    with SessionLocal() as db:
+        for start in range(0, count, 5000):
+            rows = [
+                {"event_type": BENCH_TYPE, "user_id": None, "data": {"n": n}}
+                for n in range(start, min(count, start + 5000))
+            ]
+            db.execute(insert(DomainEvent), rows)
+            db.commit()
+
+
+def relay(relays: int, batch_size: int) -> float:
+    client = get_redis()
+
+    def drain() -> None:
+        while True:
+            with SessionLocal() as db:
+                if event_relay.relay_batch(db, client, batch_size) == 0:
+                    return
+
+    threads = [threading.Thread(target=drain) for _ in range(relays)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def consume(expected: int, count: int) -> tuple[float, int]:
+    client = get_redis()
+    seen: set = set()
+
+    def handler(entries) -> None:
+        seen.update(entry["event_id"] for entry in entries if entry["type"] == BENCH_TYPE)
+
+    started = time.perf_counter()
+    while len(seen) < expected:
+        if event_relay.consume(client, "bench", "bench-1", handler, count=count, block_ms=500) == 0:
+            break
+    return time.perf_counter() - started, len(seen)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--relays", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--consume-count", type=int, default=500)
+    parser.add_argument("--overhead-iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        backlog = db.scalar(
+            select(func.count()).where(
+                DomainEvent.published_at.is_(None), DomainEvent.event_type != BENCH_TYPE
+            )
+        )
+    if backlog:
+        sys.exit(f"{backlog} real events are unpublished; drain them before benchmarking")
+
+    settings.events_stream = f"bench:events:{uuid4().hex}"
+    settings.events_consumer_groups = "bench"
+    client = get_redis()
+    try:
+        event_relay.ensure_consumer_groups(client)
+        commit_overhead(args.overhead_iterations)
+        seed(args.events)
+        total = args.events + args.overhead_iterations * 3
+        elapsed = relay(args.relays, args.batch_size)
+        print(f"relay: {total} events in {elapsed:.2f}s = {total / elapsed:.0f} events/s")
+        elapsed, received = consume(total, args.consume_count)
+        print(f"consume: {received} events in {elapsed:.2f}s = {received / elapsed:.0f} events/s")
+    finally:
+        client.delete(settings.events_stream)
+        with SessionLocal() as db:
+            db.execute(delete(DomainEvent).where(DomainEvent.event_type == BENCH_TYPE))
+            db.commit()
+    if received < total:
+        print(f"FAIL {total - received} events never reached the consumer group")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
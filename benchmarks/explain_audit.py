@@ -0,0 +1,233 @@
+"""EXPLAIN (ANALYZE, BUFFERS) audit of the hot auth queries against a local Postgres.
+
+Runs the statements the services actually issue, each inside a transaction that
+is rolled back, with enable_seqscan off: any sequential scan left in a plan
+means no usable index exists. Buffer counts are compared with a baseline and a
+query that reads more than --tolerance times its baseline fails as a
+regression. Also checks that every foreign key into users has an index for
+the ON DELETE CASCADE lookups. Exits non-zero on any failure.
+
+    alembic upgrade head
+    python -m benchmarks.explain_audit --seed-users 20000 --update-baseline
+    python -m benchmarks.explain_audit
+"""
+
+import argparse
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import sys
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.db.models.email import EmailOutbox
+from app.db.models.event import DomainEvent
+from app.db.models.token import EmailVerificationToken, PasswordResetToken, RefreshToken
+from app.db.models.user import User
+from app.db.session import engine
+from app.services import admin_service, auth_service, email_outbox, event_relay, sessions
+
+BASELINE = Path(__file__).with_name("explain_baseline.json")
+TABLES = (
+    "users",
+    "refresh_tokens",
+    "email_verification_tokens",
+    "password_reset_tokens",
+    "email_outbox",
+    "domain_events",
+)
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, password_hash, is_active, is_verified, role, session_generation)
+    SELECT gen_random_uuid(), 'audit' || g || '@example.com', 'x', true, true, 'user', 0
+    FROM generate_series(1, :users) g
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO refresh_tokens (id, user_id, family_id, token_jti, expires_at, revoked_at)
+    SELECT gen_random_uuid(), u.id, gen_random_uuid(), gen_random_uuid()::text,
+           now() + random() * interval '7 days',
+           CASE WHEN g % 2 = 0 THEN now() END
+    FROM users u CROSS JOIN generate_series(1, :per_user) g
+    WHERE u.email LIKE 'audit%'
+    """,
+    """
+    INSERT INTO email_verification_tokens (id, user_id, token, expires_at, used_at)
+    SELECT gen_random_uuid(), u.id, md5(random()::text), now() + interval '1 hour',
+           CASE WHEN random() < 0.5 THEN now() END
+    FROM users u WHERE u.email LIKE 'audit%'
+    """,
+    """
+    INSERT INTO password_reset_tokens (id, user_id, token, expires_at, used_at)
+    SELECT gen_random_uuid(), u.id, md5(random()::text), now() + interval '30 minutes',
+           CASE WHEN random() < 0.5 THEN now() END
+    FROM users u WHERE u.email LIKE 'audit%'
+    """,
+]
+
+FK_INDEX_SQL = """
+SELECT c.conrelid::regclass::text AS table_name, a.attname AS column_name
+FROM pg_constraint c
+JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+WHERE c.contype = 'f' AND c.confrelid = 'users'::regclass
+  AND c.conrelid NOT IN (SELECT inhrelid FROM pg_inherits)
+  AND NOT EXISTS (
+    SELECT 1 FROM pg_index i
+    WHERE i.indrelid = c.conrelid AND i.indkey[0] = c.conkey[1]
+  )
+"""
+
+
+def seed(db: Session, users: int, per_user: int) -> None:
+    for statement in SEED_SQL:
+        db.execute(text(statement), {"users": users, "per_user": per_user})
+    db.commit()
+    for table in TABLES:
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+
+
+def sample(db: Session) -> dict:
+    live = db.execute(
+        select(RefreshToken.token_jti, RefreshToken.family_id, RefreshToken.user_id)
+        .where(RefreshToken.revoked_at.is_(None))
+        .limit(1)
+    ).one()
+    revoked = db.scalar(
+        select(RefreshToken.token_jti).where(RefreshToken.revoked_at.is_not(None)).limit(1)
+    )
+    user = db.execute(select(User.id, User.email).where(User.id == live.user_id)).one()
+    return {
+        "jti": live.token_jti,
+        "revoked_jti": revoked,
+        "family_id": live.family_id,
+        "user_id": user.id,
+        "email": user.email,
+        "verification": db.scalar(select(EmailVerificationToken.token).limit(1)),
+        "reset": db.scalar(select(PasswordResetToken.token).limit(1)),
+    }
+
+
+def hot_queries(values: dict) -> dict:
+    now = datetime.now(timezone.utc)
+    queries = {
+        "user_by_email": select(User).where(User.email == values["email"]),
+        "user_by_id": select(User).where(User.id == values["user_id"]),
+        "verification_lookup": select(EmailVerificationToken).where(
+            EmailVerificationToken.token == values["verification"],
+            EmailVerificationToken.used_at.is_(None),
+        ),
+        "reset_lookup": select(PasswordResetToken).where(
+            PasswordResetToken.token == values["reset"],
+            PasswordResetToken.used_at.is_(None),
+        ),
+        "refresh_consume": auth_service._consume_refresh_statement(values["jti"], 0),
+        "refresh_reuse_lookup": auth_service._reused_family_statement(values["revoked_jti"]),
+        "refresh_revoke_family": auth_service._revoke_family_statement(values["family_id"]),
+        "logout_lookup": select(RefreshToken).where(RefreshToken.token_jti == values["jti"]),
+        "bump_generation": sessions._bump_user_statement(values["user_id"]),
+        "delete_user_cascade": delete(User).where(User.id == values["user_id"]),
+        "admin_list_users": admin_service.filtered_users(admin_service.UserFilters()).limit(51),
+        "admin_list_users_by_prefix": admin_service.filtered_users(
+            admin_service.UserFilters(email_prefix=values["email"][:6])
+        ).limit(51),
+        "email_outbox_claim": email_outbox._claim_statement(100),
+        "event_relay_claim": event_relay._unpublished_statement(500),
+    }
+    for model, column_name in (
+        (RefreshToken, "expires_at"),
+        (EmailVerificationToken, "expires_at"),
+        (EmailVerificationToken, "used_at"),
+        (PasswordResetToken, "expires_at"),
+        (PasswordResetToken, "used_at"),
+        (EmailOutbox, "sent_at"),
+        (DomainEvent, "published_at"),
+    ):
+        column = getattr(model, column_name)
+        queries[f"reap_{model.__tablename__}_{column_name}"] = (
+            select(column, model.id).where(column < now).order_by(column, model.id).limit(1000)
+        )
+    return queries
+
+
+def walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(db: Session, statement) -> dict:
+    compiled = statement.compile(dialect=engine.dialect)
+    connection = db.connection()
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    result = connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    document = (json.loads(result) if isinstance(result, str) else result)[0]
+    db.rollback()
+    nodes = list(walk(document["Plan"]))
+    seq_scans = sorted(
+        {
+            node["Relation Name"]
+            for node in nodes
+            if node["Node Type"] == "Seq Scan"
+            and node.get("Relation Name", "").startswith(TABLES)
+        }
+    )
+    root = document["Plan"]
+    return {
+        "seq_scans": seq_scans,
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "ms": document.get("Execution Time", 0.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--seed-users", type=int, default=0)
+    parser.add_argument("--tokens-per-user", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=2.0)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failures = []
+    results = {}
+    with Session(engine) as db:
+        if args.seed_users:
+            seed(db, args.seed_users, args.tokens_per_user)
+        values = sample(db)
+        db.rollback()
+
+        print(f"{'query':<44} {'buffers':>8} {'baseline':>8} {'ms':>8}  seq scans")
+        for name, statement in hot_queries(values).items():
+            result = explain(db, statement)
+            results[name] = result["buffers"]
+            expected = baseline.get(name)
+            print(
+                f"{name:<44} {result['buffers']:>8} {expected if expected is not None else '-':>8} "
+                f"{result['ms']:>8.2f}  {', '.join(result['seq_scans']) or '-'}"
+            )
+            if result["seq_scans"]:
+                failures.append(f"{name}: sequential scan on {', '.join(result['seq_scans'])}")
+            regressed = expected and result["buffers"] > expected * args.tolerance
+            if regressed and not args.update_baseline:
+                failures.append(f"{name}: {result['buffers']} buffers vs baseline {expected}")
+
+        for table_name, column_name in db.execute(text(FK_INDEX_SQL)):
+            failures.append(f"{table_name}.{column_name}: foreign key to users has no index")
+
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {BASELINE}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
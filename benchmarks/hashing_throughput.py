@@ -0,0 +1,52 @@
+"""bcrypt verifications/sec inline (threads, GIL-bound) vs the process-pool executor.
+
+    python -m benchmarks.hashing_throughput --verifications 64 --workers 1 2 4 8
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from app.core import security
+from app.core.hashing import HashExecutor
+
+
+def run_threads(hashed: str, verifications: int, workers: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: security.verify_password("StrongPass123", hashed), range(verifications)))
+    return verifications / (time.perf_counter() - started)
+
+
+def run_processes(hashed: str, verifications: int, workers: int) -> float:
+    executor = HashExecutor(workers=workers, max_pending=verifications)
+    # Spawn the worker processes before timing.
+    for future in [executor.submit(security.verify_password, "x", hashed) for _ in range(workers)]:
+        future.result()
+    started = time.perf_counter()
+    futures = [
+        executor.submit(security.verify_password, "StrongPass123", hashed) for _ in range(verifications)
+    ]
+    for future in futures:
+        future.result()
+    rate = verifications / (time.perf_counter() - started)
+    executor.shutdown()
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--verifications", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    hashed = security.hash_password("StrongPass123")
+    print(f"{'workers':>7} {'threads/s':>10} {'processes/s':>12}")
+    for workers in args.workers:
+        threads = run_threads(hashed, args.verifications, workers)
+        processes = run_processes(hashed, args.verifications, workers)
+        print(f"{workers:>7} {threads:>10.1f} {processes:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
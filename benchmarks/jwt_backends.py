@@ -0,0 +1,107 @@
+"""Encode/decode throughput and allocations per JWT backend and algorithm.
+
+Keys are generated in memory, so nothing needs to be configured:
+
+    python -m benchmarks.jwt_backends --iterations 5000
+    python -m benchmarks.jwt_backends --backends fast pyjwt --algorithms HS256
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.core.jwt_backends import BACKENDS
+
+ALGORITHMS = ["HS256", "RS256", "ES256", "EdDSA"]
+
+
+def key_material(algorithm: str) -> tuple[bytes, bytes]:
+    if algorithm.startswith("HS"):
+        secret = b"benchmark-secret-with-enough-entropy"
+        return secret, secret
+    if algorithm.startswith("RS"):
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm.startswith("ES"):
+        private = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem
+
+
+def ops_per_second(iterations: int, fn) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def peak_bytes_per_op(fn) -> int:
+    # Peak traced memory during a single call: the transient allocation cost.
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    claims = {
+        "sub": "00000000-0000-0000-0000-000000000000",
+        "jti": "11111111-1111-1111-1111-111111111111",
+        "iat": now,
+        "exp": now + 900,
+        "type": "access",
+    }
+    keys = {algorithm: key_material(algorithm) for algorithm in args.algorithms}
+
+    print(
+        f"{'backend':<8} {'alg':<6} {'encode/s':>10} {'decode/s':>10} "
+        f"{'enc alloc B':>11} {'dec alloc B':>11}"
+    )
+    for name in args.backends:
+        backend = BACKENDS[name]()
+        for algorithm in args.algorithms:
+            if algorithm not in backend.algorithms:
+                print(f"{name:<8} {algorithm:<6} {'n/a':>10}")
+                continue
+            private_pem, public_pem = keys[algorithm]
+            sign_key = backend.prepare_key(private_pem, algorithm)
+            verify_key = backend.prepare_key(public_pem, algorithm)
+            headers = {"kid": "bench"}
+            token = backend.encode(claims, sign_key, algorithm, headers)
+
+            def encode() -> None:
+                backend.encode(claims, sign_key, algorithm, headers)
+
+            def decode() -> None:
+                backend.decode(token, verify_key, algorithm)
+
+            iterations = args.iterations if algorithm.startswith("HS") else max(1, args.iterations // 10)
+            print(
+                f"{name:<8} {algorithm:<6} {ops_per_second(iterations, encode):>10.0f} "
+                f"{ops_per_second(iterations, decode):>10.0f} {peak_bytes_per_op(encode):>11} "
+                f"{peak_bytes_per_op(decode):>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
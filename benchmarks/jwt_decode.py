@@ -0,0 +1,38 @@
+"""decode_token ops/sec with a cold verification cache vs the cached path.
+
+Uses the configured JWT_ALGORITHM / key ring:
+
+    python -m benchmarks.jwt_decode --iterations 20000
+"""
+
+import argparse
+import time
+
+from app.core.security import create_access_token, decode_token, verified_tokens
+
+
+def ops_per_second(iterations: int, fn) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token("00000000-0000-0000-0000-000000000000")
+
+    def cold() -> None:
+        verified_tokens.clear()
+        decode_token(token)
+
+    decode_token(token)
+    print(f"cold decode:   {ops_per_second(args.iterations, cold):>12.0f} ops/s")
+    print(f"cached decode: {ops_per_second(args.iterations, lambda: decode_token(token)):>12.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
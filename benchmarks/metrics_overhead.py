@@ -0,0 +1,64 @@
+"""Per-request cost of MetricsMiddleware and stage timing, in process.
+
+Drives GET /health through the ASGI app with and without METRICS_ENABLED
+(and with SERVER_TIMING_ENABLED on top), so the difference is the
+middleware alone. Then times the stage() context manager that wraps
+hashing, queries, Redis and JWT calls. No Postgres or Redis is needed:
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+from app.main import create_app
+
+
+async def drive(requests: int) -> float:
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get("/health")
+            samples.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return statistics.median(samples) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--stages", type=int, default=200_000)
+    args = parser.parse_args()
+
+    results = {}
+    for label, enabled, server_timing in (
+        ("off", False, False),
+        ("metrics", True, False),
+        ("metrics+server-timing", True, True),
+    ):
+        settings.metrics_enabled, settings.server_timing_enabled = enabled, server_timing
+        results[label] = asyncio.run(drive(args.requests))
+        print(
+            f"{label:<22} p50={results[label]:.1f}us "
+            f"(+{results[label] - results['off']:.1f}us)"
+        )
+
+    started = time.perf_counter()
+    for _ in range(args.stages):
+        with metrics.stage("bench"):
+            pass
+    print(f"stage(): {(time.perf_counter() - started) / args.stages * 1_000_000:.2f}us per span")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Find the smallest database pool that saturates throughput for each worker count.
+
+Starts uvicorn with --workers N and DB_POOL_SIZE=P (no overflow, so P is the
+per-process cap) for every combination, logs in with an existing admin
+account and drives concurrent requests at an endpoint that queries Postgres
+on every call. Reports requests/sec, latency, pool checkout waits and
+timeouts as seen by one worker, and per worker count the smallest pool
+within --tolerance of the best throughput:
+
+    python -m benchmarks.pool_sizing --email admin@example.com --password StrongPass123 \\
+        --workers 1,2,4 --pool-sizes 2,5,10,20 --concurrency 200 --requests 10000
+
+Workers x pool size is the number of Postgres connections the app can hold;
+keep it under max_connections (or PgBouncer's default_pool_size).
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+
+import httpx
+
+from benchmarks.load_test import drive
+
+
+async def pool_wait(base_url: str, args: argparse.Namespace) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        login = await client.post(
+            "/api/v1/auth/login", json={"email": args.email, "password": args.password}
+        )
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        response = await client.get("/api/v1/admin/stats/pool", headers=headers)
+        response.raise_for_status()
+        return response.json()["primary"]
+
+
+def run(workers: int, pool_size: int, args: argparse.Namespace) -> dict:
+    env = dict(
+        os.environ,
+        WEB_WORKERS=str(workers),
+        DB_POOL_SIZE=str(pool_size),
+        DB_MAX_OVERFLOW="0",
+        EMAIL_WORKER_ENABLED="false",
+        EVENTS_RELAY_ENABLED="false",
+        # Every run logs in twice; keep the login limits out of the way.
+        RATE_LIMIT_LOGIN="1000000",
+        RATE_LIMIT_LOGIN_EMAIL="1000000",
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(args.port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        result = asyncio.run(drive(base_url, args))
+        result["pool"] = asyncio.run(pool_wait(base_url, args))
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/api/v1/admin/users?limit=50")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--pool-sizes", default="2,5,10,20")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(
+        f"{'workers':>7} {'pool':>5} {'conns':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'wait p99':>9} {'timeouts':>9} {'errors':>7}"
+    )
+    for workers in (int(value) for value in args.workers.split(",")):
+        results = {}
+        for pool_size in (int(value) for value in args.pool_sizes.split(",")):
+            result = results[pool_size] = run(workers, pool_size, args)
+            print(
+                f"{workers:>7} {pool_size:>5} {workers * pool_size:>6} {result['rps']:>9.1f} "
+                f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['pool']['wait_p99_ms']:>9.2f} {result['pool']['timeouts']:>9} "
+                f"{result['errors']:>7}"
+            )
+        best = max(results, key=lambda pool_size: results[pool_size]["rps"])
+        chosen = min(
+            (
+                pool_size
+                for pool_size, result in results.items()
+                if result["rps"] >= results[best]["rps"] * (1 - args.tolerance)
+                and not result["errors"]
+            ),
+            default=best,
+        )
+        print(f"workers={workers}: DB_POOL_SIZE={chosen} is within {args.tolerance:.0%} of best")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Per-request overhead of the rate limiter engines against a real Redis.
+
+Compares the previous INCR + EXPIRE fixed window with the single-EVALSHA GCRA
+and token-bucket scripts, for one key and for a composed IP + email check.
+``--attack`` instead replays a login flood at 1x and 10x volume and counts how
+many requests reach Redis with and without the local prefilter:
+
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.rate_limit --requests 20000
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.rate_limit --attack
+"""
+
+import argparse
+import time
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import LocalPrefilter, RateLimit, RateLimiter
+from app.core.redis import get_redis
+
+
+def legacy_hit(key: str, limit: int, window_seconds: int) -> None:
+    redis = get_redis()
+    count = redis.incr(key)
+    if count == 1:
+        redis.expire(key, window_seconds)
+
+
+def measure(label: str, requests: int, fn) -> None:
+    started = time.perf_counter()
+    for index in range(requests):
+        fn(index)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed / requests * 1e6:>10.1f} us/request")
+
+
+def redis_calls_under_attack(requests: int, attackers: int, use_prefilter: bool) -> int:
+    rate_limit.prefilter = (
+        LocalPrefilter(
+            blocked_size=settings.rate_limit_local_blocked_size,
+            width=settings.rate_limit_local_sketch_width,
+            depth=settings.rate_limit_local_sketch_depth,
+            factor=settings.rate_limit_local_factor,
+            window_seconds=60,
+        )
+        if use_prefilter
+        else None
+    )
+    limiter = RateLimiter()
+    prefix = f"bench:{uuid4().hex}"
+    calls = 0
+    original = rate_limit.get_redis
+
+    def counting_redis():
+        nonlocal calls
+        calls += 1
+        return original()
+
+    rate_limit.get_redis = counting_redis
+    try:
+        for index in range(requests):
+            try:
+                limiter.check(RateLimit(f"{prefix}:ip:{index % attackers}", 5, 60))
+            except HTTPException:
+                pass
+    finally:
+        rate_limit.get_redis = original
+    return calls
+
+
+def attack(args: argparse.Namespace) -> None:
+    print(f"{'traffic':>8} {'requests':>9} {'redis (no prefilter)':>21} {'redis (prefilter)':>18}")
+    for multiplier in (1, 10):
+        requests = args.requests * multiplier
+        without = redis_calls_under_attack(requests, args.attackers, use_prefilter=False)
+        with_prefilter = redis_calls_under_attack(requests, args.attackers, use_prefilter=True)
+        print(f"{multiplier:>7}x {requests:>9} {without:>21} {with_prefilter:>18}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--attack", action="store_true")
+    parser.add_argument("--attackers", type=int, default=50)
+    args = parser.parse_args()
+    if args.attack:
+        attack(args)
+        return
+
+    prefix = f"bench:{uuid4().hex}"
+    limit = args.requests * 2
+
+    def key(kind: str, index: int) -> str:
+        return f"{prefix}:{kind}:{index % args.keys}"
+
+    measure(
+        "incr+expire (1 key)",
+        args.requests,
+        lambda i: legacy_hit(key("legacy", i), limit, 60),
+    )
+    measure(
+        "incr+expire (2 keys)",
+        args.requests,
+        lambda i: (legacy_hit(key("legacy-ip", i), limit, 60), legacy_hit(key("legacy-em", i), limit, 60)),
+    )
+    for algorithm in ("gcra", "token_bucket"):
+        limiter = RateLimiter(algorithm)
+        measure(
+            f"{algorithm} (1 key)",
+            args.requests,
+            lambda i: limiter.check(RateLimit(key(algorithm, i), limit, 60)),
+        )
+        measure(
+            f"{algorithm} (2 keys)",
+            args.requests,
+            lambda i: limiter.check(
+                RateLimit(key(f"{algorithm}-ip", i), limit, 60),
+                RateLimit(key(f"{algorithm}-em", i), limit, 60),
+            ),
+        )
+
+    redis = get_redis()
+    for found in redis.scan_iter(f"{prefix}:*", count=1000):
+        redis.delete(found)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Connections opened against Redis per 1k logins, per-call clients vs the shared pool.
+
+Runs against a local fake Redis (a tiny RESP server started in-process) so it
+needs no running Redis:
+
+    python -m benchmarks.redis_connections --logins 1000
+"""
+
+import argparse
+import os
+import socketserver
+import threading
+import time
+from uuid import uuid4
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        self.server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if not line.startswith(b"*"):
+                continue
+            args = []
+            for _ in range(int(line[1:])):
+                size = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(size + 2)[:-2])
+            command = args[0].upper()
+            if command == b"GET":
+                self.wfile.write(b"$-1\r\n")
+            elif command in (b"DEL", b"EXISTS"):
+                self.wfile.write(b":1\r\n")
+            elif command == b"PING":
+                self.wfile.write(b"+PONG\r\n")
+            else:
+                self.wfile.write(b"+OK\r\n")
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.connections = 0
+
+
+def simulate_login(redis_client) -> None:
+    # The Redis work a login does today: one SETEX for the new refresh token.
+    redis_client.setex(f"refresh:{uuid4()}", 60, "user-id")
+
+
+def run(logins: int) -> None:
+    server = FakeRedisServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["REDIS_URL"] = f"redis://127.0.0.1:{server.server_address[1]}/0"
+
+    import redis
+
+    from app.core import redis as redis_module
+
+    started = time.perf_counter()
+    for _ in range(logins):
+        client = redis.Redis.from_url(os.environ["REDIS_URL"], decode_responses=True)
+        simulate_login(client)
+        client.close()
+    before_elapsed = time.perf_counter() - started
+    before = server.connections
+
+    server.connections = 0
+    started = time.perf_counter()
+    for _ in range(logins):
+        simulate_login(redis_module.get_redis())
+    after_elapsed = time.perf_counter() - started
+    after = server.connections
+    redis_module.close_redis()
+    server.shutdown()
+
+    print(f"logins: {logins}")
+    print(f"per-call clients: {before} connections, {before_elapsed * 1000:.1f} ms")
+    print(f"shared pool:      {after} connections, {after_elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=1000)
+    run(parser.parse_args().logins)
@@ -0,0 +1,98 @@
+"""Refresh rotation latency and a double-spend check, against the configured Postgres and Redis.
+
+Sequential mode rotates one token chain and reports per-refresh latency. Race
+mode presents the same refresh token from many threads at once; they may all
+succeed within REFRESH_REUSE_GRACE_SECONDS, but must all get the same successor,
+otherwise the script exits non-zero:
+
+    python -m benchmarks.refresh_rotation --email user@example.com --refreshes 500
+    python -m benchmarks.refresh_rotation --email user@example.com --race --rounds 50 --concurrency 32
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import sys
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.security import decode_token
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services import auth_service
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_user(email: str) -> User:
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == email))
+        if user is None:
+            raise SystemExit(f"no user {email!r}")
+        db.expunge(user)
+        return user
+
+
+def sequential(user: User, refreshes: int) -> None:
+    latencies = []
+    with SessionLocal() as db:
+        _, token = auth_service.create_token_pair(db, user)
+        for _ in range(refreshes):
+            started = time.perf_counter()
+            _, token = auth_service.refresh_tokens(db, token)
+            latencies.append(time.perf_counter() - started)
+    print(
+        f"refreshes={refreshes} p50={statistics.median(latencies) * 1000:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms"
+    )
+
+
+def race(user: User, rounds: int, concurrency: int) -> bool:
+    double_spends = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(rounds):
+            with SessionLocal() as db:
+                _, token = auth_service.create_token_pair(db, user)
+            barrier = threading.Barrier(concurrency)
+
+            def attempt(_: int) -> str | None:
+                with SessionLocal() as db:
+                    barrier.wait()
+                    try:
+                        return decode_token(auth_service.refresh_tokens(db, token)[1])["jti"]
+                    except HTTPException:
+                        return None
+
+            successors = set(pool.map(attempt, range(concurrency))) - {None}
+            if len(successors) > 1:
+                double_spends += 1
+    print(f"rounds={rounds} concurrency={concurrency} double_spends={double_spends}")
+    return double_spends == 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--refreshes", type=int, default=500)
+    parser.add_argument("--race", action="store_true")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    user = load_user(args.email)
+    if args.race:
+        sys.exit(0 if race(user, args.rounds, args.concurrency) else 1)
+    sequential(user, args.refreshes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Measure cold start time and memory per worker for the production server profile.
+
+Starts gunicorn with gunicorn.conf.py for every worker count, with the app
+preloaded in the master and without, and reports:
+
+- ready: seconds from spawn until /health/live answers 200
+- all up: seconds until every worker has logged "Application startup complete"
+- RSS and PSS (proportional set size, which splits pages shared after fork
+  between the processes using them) for the master and per worker
+- processes: the running process tree, and the total once every worker has
+  started its hash pool (master + workers x (1 + hash pool size)); hash pools
+  start on the first hash, so they are not running yet at startup
+
+    python -m benchmarks.startup --workers 1,2,4,8
+
+PSS needs /proc/<pid>/smaps_rollup (Linux 4.14+). Nothing connects to
+Postgres or Redis at import or startup, so neither needs to be reachable.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+from app.core.config import Settings
+
+
+def children(pid: int) -> list[int]:
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                # The command name may contain spaces; the ppid follows its ")".
+                ppid = int(handle.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            found.append(int(entry))
+    return found
+
+
+def descendants(pid: int) -> list[int]:
+    found = children(pid)
+    for child in list(found):
+        found.extend(descendants(child))
+    return found
+
+
+def memory_kib(pid: int) -> tuple[int, int]:
+    rss = pss = 0
+    with open(f"/proc/{pid}/status") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def run(workers: int, preload: bool, args: argparse.Namespace) -> dict:
+    env = dict(
+        os.environ,
+        WEB_BIND=f"127.0.0.1:{args.port}",
+        WEB_WORKERS=str(workers),
+        WEB_PRELOAD=str(preload).lower(),
+        EMAIL_WORKER_ENABLED="false",
+        EVENTS_RELAY_ENABLED="false",
+        MAINTENANCE_ENABLED="false",
+    )
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app",
+            "--log-level", "info",
+        ],
+        env=env,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    booted = threading.Event()
+    all_up: list[float] = []
+
+    def watch() -> None:
+        seen = 0
+        for line in server.stderr:
+            if "Application startup complete" in line:
+                seen += 1
+                if seen == workers:
+                    all_up.append(time.perf_counter() - started)
+                    booted.set()
+
+    threading.Thread(target=watch, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        ready = None
+        deadline = started + args.timeout
+        while ready is None and time.perf_counter() < deadline:
+            try:
+                if httpx.get(f"{base_url}/health/live", timeout=1.0).status_code == 200:
+                    ready = time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        if ready is None or not booted.wait(max(0.0, deadline - time.perf_counter())):
+            raise RuntimeError(f"server did not start within {args.timeout}s")
+        # Let workers settle (lazy imports, first request) before reading memory.
+        time.sleep(args.settle)
+        master_rss, master_pss = memory_kib(server.pid)
+        worker_memory = [memory_kib(pid) for pid in children(server.pid)]
+        hash_pool_size = Settings(web_workers=workers).hash_pool_size
+        return {
+            "ready_s": ready,
+            "all_up_s": all_up[0],
+            "master_rss_mib": master_rss / 1024,
+            "master_pss_mib": master_pss / 1024,
+            "worker_rss_mib": sum(rss for rss, _ in worker_memory) / len(worker_memory) / 1024,
+            "worker_pss_mib": sum(pss for _, pss in worker_memory) / len(worker_memory) / 1024,
+            "total_pss_mib": (master_pss + sum(pss for _, pss in worker_memory)) / 1024,
+            "processes": 1 + len(descendants(server.pid)),
+            "max_processes": 1 + workers * (1 + hash_pool_size),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--settle", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    print(
+        f"{'workers':>7} {'preload':>7} {'ready s':>8} {'all up s':>9} {'master PSS':>11} "
+        f"{'worker RSS':>11} {'worker PSS':>11} {'total PSS':>10} {'procs':>6} {'max procs':>10}"
+    )
+    for workers in (int(value) for value in args.workers.split(",")):
+        for preload in (True, False):
+            result = run(workers, preload, args)
+            print(
+                f"{workers:>7} {str(preload).lower():>7} {result['ready_s']:>8.2f} "
+                f"{result['all_up_s']:>9.2f} {result['master_pss_mib']:>10.1f}M "
+                f"{result['worker_rss_mib']:>10.1f}M {result['worker_pss_mib']:>10.1f}M "
+                f"{result['total_pss_mib']:>9.1f}M {result['processes']:>6} "
+                f"{result['max_processes']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
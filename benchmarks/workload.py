@@ -0,0 +1,355 @@
+"""Mixed auth workload with per-endpoint latency and a regression gate.
+
+Seeds verified users (and refresh tokens in Postgres and Redis, so tables
+and keyspaces have production-like sizes), then runs virtual users for
+--duration seconds. Each virtual user owns one seeded account and picks
+operations by weight: login, refresh, GET /users/me, logout, register and
+password reset (request, then confirm with the token read from the email
+outbox). The app runs in process through create_app() (--mode inprocess),
+or under uvicorn (--mode uvicorn --workers N), against the configured
+Postgres and Redis. Rate limits are raised so they never trip.
+
+Reports requests/sec and p50/p95/p99 per endpoint and compares them with
+benchmarks/workload_baseline.json. The run fails on any unexpected status,
+or when an endpoint's p95 grows, or its throughput drops, by more than
+--tolerance compared with the baseline for the same mode:
+
+    python -m benchmarks.workload --seed-users 20000 --tokens-per-user 5
+    python -m benchmarks.workload --concurrency 50 --duration 60 --update-baseline
+    python -m benchmarks.workload --concurrency 50 --duration 60
+    python -m benchmarks.workload --mode uvicorn --workers 4 --concurrency 200
+    python -m benchmarks.workload --clean
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+import json
+import os
+from pathlib import Path
+import random
+import statistics
+import subprocess
+import sys
+import time
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import delete, select, text
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.security import pwd_context
+from app.db.models.email import EmailOutbox
+from app.db.models.event import DomainEvent
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.main import create_app
+from app.services.auth_service import REDIS_REFRESH_PREFIX
+from app.services.email_service import PASSWORD_RESET
+from benchmarks.load_test import percentile, wait_until_ready
+
+BASELINE = Path(__file__).with_name("workload_baseline.json")
+DOMAIN = "workload.example.com"
+PASSWORD = "BenchPassword123"
+P = "/api/v1"
+WEIGHTS = {
+    "me": 50,
+    "refresh": 20,
+    "login": 15,
+    "logout": 6,
+    "register": 5,
+    "password_reset": 4,
+}
+RATE_LIMITS = {
+    "RATE_LIMIT_LOGIN": "1000000",
+    "RATE_LIMIT_LOGIN_EMAIL": "1000000",
+    "RATE_LIMIT_REGISTER": "1000000",
+}
+
+SEED_USERS_SQL = f"""
+INSERT INTO users (id, email, password_hash, is_active, is_verified, role, session_generation)
+SELECT gen_random_uuid(), 'bench' || g || '@{DOMAIN}', :password_hash, true, true, 'user', 0
+FROM generate_series(1, :users) g
+ON CONFLICT DO NOTHING
+"""
+SEED_TOKENS_SQL = f"""
+INSERT INTO refresh_tokens (id, user_id, family_id, token_jti, expires_at, revoked_at)
+SELECT gen_random_uuid(), u.id, gen_random_uuid(), gen_random_uuid()::text,
+       now() + interval '1 hour', CASE WHEN g % 2 = 0 THEN now() END
+FROM users u CROSS JOIN generate_series(1, :per_user) g
+WHERE u.email LIKE 'bench%@{DOMAIN}'
+RETURNING token_jti, user_id, revoked_at IS NULL AS live
+"""
+
+
+def bench_users():
+    return User.email.like(f"%@{DOMAIN}")
+
+
+def seed(users: int, per_user: int) -> None:
+    client = get_redis()
+    with SessionLocal() as db:
+        db.execute(
+            text(SEED_USERS_SQL), {"password_hash": pwd_context.hash(PASSWORD), "users": users}
+        )
+        pipeline = client.pipeline(transaction=False)
+        seeded = 0
+        for row in db.execute(text(SEED_TOKENS_SQL), {"per_user": per_user}):
+            if row.live:
+                pipeline.set(f"{REDIS_REFRESH_PREFIX}{row.token_jti}", str(row.user_id), ex=3600)
+            seeded += 1
+            if seeded % 5000 == 0:
+                pipeline.execute()
+        pipeline.execute()
+        db.commit()
+        db.execute(text("ANALYZE users"))
+        db.execute(text("ANALYZE refresh_tokens"))
+        db.commit()
+    print(f"seeded up to {users} users and {seeded} refresh tokens")
+
+
+def clean() -> None:
+    with SessionLocal() as db:
+        user_ids = select(User.id).where(bench_users())
+        db.execute(delete(DomainEvent).where(DomainEvent.user_id.in_(user_ids)))
+        db.execute(delete(EmailOutbox).where(EmailOutbox.recipient.like(f"%@{DOMAIN}")))
+        db.execute(delete(User).where(bench_users()))
+        db.commit()
+    print("removed benchmark users, their tokens, events and emails")
+
+
+def reset_token(email: str) -> str:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(EmailOutbox.token)
+            .where(EmailOutbox.recipient == email, EmailOutbox.kind == PASSWORD_RESET)
+            .order_by(EmailOutbox.created_at.desc(), EmailOutbox.id.desc())
+            .limit(1)
+        )
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str, record) -> None:
+        self.client = client
+        self.email = email
+        self.record = record
+        self.tokens: dict | None = None
+
+    async def call(self, name: str, method: str, path: str, expected: int = 200, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, path, **kwargs)
+        self.record(name, time.perf_counter() - started, response.status_code == expected)
+        return response if response.status_code == expected else None
+
+    async def login(self) -> None:
+        response = await self.call(
+            "login", "POST", f"{P}/auth/login", json={"email": self.email, "password": PASSWORD}
+        )
+        self.tokens = response.json() if response else None
+
+    async def step(self, operation: str) -> None:
+        if self.tokens is None or operation == "login":
+            await self.login()
+        elif operation == "me":
+            headers = {"Authorization": f"Bearer {self.tokens['access_token']}"}
+            await self.call("me", "GET", f"{P}/users/me", headers=headers)
+        elif operation == "refresh":
+            response = await self.call(
+                "refresh",
+                "POST",
+                f"{P}/auth/refresh",
+                json={"refresh_token": self.tokens["refresh_token"]},
+            )
+            self.tokens = response.json() if response else None
+        elif operation == "logout":
+            await self.call(
+                "logout",
+                "POST",
+                f"{P}/auth/logout",
+                json={"refresh_token": self.tokens["refresh_token"]},
+            )
+            self.tokens = None
+        elif operation == "register":
+            email = f"new-{uuid4().hex}@{DOMAIN}"
+            await self.call(
+                "register",
+                "POST",
+                f"{P}/auth/register",
+                201,
+                json={"email": email, "password": PASSWORD},
+            )
+        elif operation == "password_reset":
+            await self.call(
+                "reset_request",
+                "POST",
+                f"{P}/auth/password-reset/request",
+                json={"email": self.email},
+            )
+            token = await asyncio.to_thread(reset_token, self.email)
+            await self.call(
+                "reset_confirm",
+                "POST",
+                f"{P}/auth/password-reset/confirm",
+                json={"token": token, "new_password": PASSWORD},
+            )
+            # The reset ended every session of this user.
+            self.tokens = None
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    with SessionLocal() as db:
+        emails = db.scalars(
+            select(User.email).where(User.email.like(f"bench%@{DOMAIN}")).limit(args.concurrency)
+        ).all()
+    if len(emails) < args.concurrency:
+        sys.exit(f"{len(emails)} seeded users; seed at least --concurrency ({args.concurrency})")
+
+    samples: dict = defaultdict(list)
+    errors: dict = defaultdict(int)
+    measuring = False
+
+    def record(name: str, elapsed: float, ok: bool) -> None:
+        if measuring:
+            samples[name].append(elapsed)
+            errors[name] += not ok
+
+    operations, weights = zip(*WEIGHTS.items())
+    deadline = time.monotonic() + args.warmup + args.duration
+
+    async def run(email: str) -> None:
+        user = VirtualUser(client, email, record)
+        while time.monotonic() < deadline:
+            await user.step(random.choices(operations, weights)[0])
+
+    tasks = [asyncio.create_task(run(email)) for email in emails]
+    await asyncio.sleep(args.warmup)
+    measuring = True
+    await asyncio.gather(*tasks)
+
+    return {
+        name: {
+            "count": len(timings),
+            "rps": len(timings) / args.duration,
+            "p50_ms": statistics.median(timings) * 1000,
+            "p95_ms": percentile(timings, 95) * 1000,
+            "p99_ms": percentile(timings, 99) * 1000,
+            "errors": errors[name],
+        }
+        for name, timings in sorted(samples.items())
+    }
+
+
+async def run_inprocess(args: argparse.Namespace) -> dict:
+    for name, value in RATE_LIMITS.items():
+        setattr(settings, name.lower(), int(value))
+    settings.email_worker_enabled = False
+    settings.events_relay_enabled = False
+    app = create_app()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", limits=limits, timeout=60.0
+        ) as client:
+            return await drive(client, args)
+
+
+async def run_uvicorn(args: argparse.Namespace) -> dict:
+    env = dict(
+        os.environ,
+        **RATE_LIMITS,
+        WEB_WORKERS=str(args.workers),
+        EMAIL_WORKER_ENABLED="false",
+        EVENTS_RELAY_ENABLED="false",
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60.0
+        ) as client:
+            await wait_until_ready(client)
+            return await drive(client, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(results: dict, expected: dict, tolerance: float) -> list:
+    failures = []
+    for name, result in results.items():
+        if result["errors"]:
+            failures.append(f"{name}: {result['errors']} unexpected responses")
+        base = expected.get(name)
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {result['p95_ms']:.1f}ms vs {base['p95_ms']:.1f}ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            failures.append(f"{name}: {result['rps']:.1f} req/s vs {base['rps']:.1f} req/s")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--seed-users", type=int, default=0)
+    parser.add_argument("--tokens-per-user", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--clean", action="store_true")
+    args = parser.parse_args()
+
+    if args.clean:
+        clean()
+        return
+    if args.seed_users:
+        seed(args.seed_users, args.tokens_per_user)
+
+    runner = run_inprocess if args.mode == "inprocess" else run_uvicorn
+    results = asyncio.run(runner(args))
+
+    key = args.mode if args.mode == "inprocess" else f"uvicorn-{args.workers}"
+    baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    expected = baselines.get(key, {})
+    print(
+        f"{'endpoint':<15} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'base p95':>9} {'errors':>7}"
+    )
+    for name, result in results.items():
+        base = expected.get(name, {}).get("p95_ms")
+        print(
+            f"{name:<15} {result['count']:>7} {result['rps']:>8.1f} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{f'{base:.2f}' if base is not None else '-':>9} {result['errors']:>7}"
+        )
+
+    failures = compare(results, expected, args.tolerance)
+    if args.update_baseline:
+        baselines[key] = results
+        BASELINE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline for {key} written to {BASELINE}")
+        failures = [failure for failure in failures if "unexpected" in failure]
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
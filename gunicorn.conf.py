@@ -0,0 +1,12 @@
+from app.core.config import settings
+
+bind = settings.web_bind
+workers = settings.web_worker_count
+worker_class = "app.worker.Worker"
+# The master imports the app once and workers fork with it loaded, sharing
+# those pages. Nothing connects at import time; each worker's lifespan drops
+# any inherited pool state and opens its own connections.
+preload_app = settings.web_preload
+keepalive = settings.web_keepalive_seconds
+timeout = settings.web_timeout_seconds
+graceful_timeout = settings.web_graceful_timeout_seconds
@@ -0,0 +1,42 @@
+import sys
+
+import fakeredis
+import pytest
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import email, event, token, user  # noqa: F401
+from app.db.session import RoutingSession
+from app.services import auth_service
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns (domain_events.id).
+    return "INTEGER"
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    # One fake server behind every module-level get_redis() in the app.
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    for name, module in list(sys.modules.items()):
+        if name.startswith("app.") and hasattr(module, "get_redis"):
+            monkeypatch.setattr(module, "get_redis", lambda: client)
+    auth_service._rotate_script.cache_clear()
+    yield client
+    auth_service._rotate_script.cache_clear()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A file database, so concurrent sessions get their own connections.
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False)
+    engine.dispose()
@@ -0,0 +1,141 @@
+from email import message_from_bytes
+import socket
+
+from aiosmtpd.controller import Controller
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models.email import EmailOutbox
+from app.services import email_outbox
+from app.services.email_service import SmtpBackend, enqueue_verification_email
+
+
+class SinkHandler:
+    # Accepts everything except recipients whose local part asks otherwise.
+    def __init__(self) -> None:
+        self.messages: list = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("reject"):
+            return "550 No such user"
+        if address.startswith("busy"):
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if any(rcpt.startswith("greylist") for rcpt in envelope.rcpt_tos):
+            return "451 Greylisted"
+        self.messages.append(message_from_bytes(envelope.content))
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+    monkeypatch.setattr(settings, "smtp_port", port)
+    monkeypatch.setattr(settings, "smtp_starttls", False)
+    monkeypatch.setattr(settings, "smtp_username", None)
+    yield handler
+    controller.stop()
+
+
+def enqueue(session_factory, *recipients: str) -> None:
+    with session_factory() as db:
+        for recipient in recipients:
+            enqueue_verification_email(db, recipient, f"token-{recipient}")
+        db.commit()
+
+
+def rows(session_factory) -> dict:
+    with session_factory() as db:
+        return {record.recipient: record for record in db.scalars(select(EmailOutbox))}
+
+
+def deliver(session_factory, backend) -> dict:
+    with session_factory() as db:
+        return email_outbox.deliver_batch(db, backend, batch_size=100)
+
+
+def test_delivers_through_smtp(session_factory, smtp_sink):
+    enqueue(session_factory, "a@example.com", "b@example.com")
+    backend = SmtpBackend()
+    try:
+        assert deliver(session_factory, backend) == {"sent": 2, "retried": 0, "dead": 0}
+        assert deliver(session_factory, backend) == {"sent": 0, "retried": 0, "dead": 0}
+    finally:
+        backend.close()
+
+    bodies = {message["To"]: message.get_payload() for message in smtp_sink.messages}
+    assert sorted(bodies) == ["a@example.com", "b@example.com"]
+    assert "token-a@example.com" in bodies["a@example.com"]
+    assert all(record.sent_at is not None for record in rows(session_factory).values())
+
+
+def test_permanent_failures_are_dead_lettered_and_transient_ones_retried(
+    session_factory, smtp_sink
+):
+    enqueue(session_factory, "reject@example.com", "busy@example.com", "greylist@example.com")
+    backend = SmtpBackend()
+    try:
+        assert deliver(session_factory, backend) == {"sent": 0, "retried": 2, "dead": 1}
+    finally:
+        backend.close()
+
+    records = rows(session_factory)
+    assert records["reject@example.com"].dead_at is not None
+    for recipient in ("busy@example.com", "greylist@example.com"):
+        assert records[recipient].dead_at is None
+        assert records[recipient].sent_at is None
+        assert records[recipient].attempts == 1
+        assert "451" in records[recipient].last_error
+    assert smtp_sink.messages == []
+
+
+class FailingBackend(SmtpBackend):
+    # Fails with a non-SMTP error on one message, after earlier ones went out.
+    def __init__(self, fail_on: str) -> None:
+        super().__init__()
+        self.fail_on = fail_on
+
+    def send(self, record: EmailOutbox) -> None:
+        if record.recipient == self.fail_on:
+            raise RuntimeError("template rendering failed")
+        super().send(record)
+
+
+def test_error_mid_batch_does_not_resend_delivered_messages(session_factory, smtp_sink):
+    recipients = [f"user{index}@example.com" for index in range(5)]
+    enqueue(session_factory, *recipients)
+    with session_factory() as db:
+        order = [record.recipient for record in db.scalars(email_outbox._claim_statement(100))]
+
+    backend = FailingBackend(fail_on=order[2])
+    with pytest.raises(RuntimeError):
+        deliver(session_factory, backend)
+    backend.close()
+    assert [message["To"] for message in smtp_sink.messages] == order[:2]
+
+    # The unsent rows stay leased until the claim lease runs out.
+    assert deliver(session_factory, SmtpBackend())["sent"] == 0
+    with session_factory() as db:
+        for record in db.scalars(select(EmailOutbox).where(EmailOutbox.sent_at.is_(None))):
+            record.next_attempt_at = email_outbox._now()
+        db.commit()
+
+    backend = SmtpBackend()
+    try:
+        assert deliver(session_factory, backend) == {"sent": 3, "retried": 0, "dead": 0}
+    finally:
+        backend.close()
+    delivered = [message["To"] for message in smtp_sink.messages]
+    assert sorted(delivered) == sorted(recipients)
+    assert len(delivered) == len(set(delivered))
+    assert all(record.sent_at is not None for record in rows(session_factory).values())
@@ -0,0 +1,58 @@
+import pytest
+
+from app.core.config import settings
+from app.services import event_relay, events
+
+GROUPS = "audit,fraud"
+
+
+@pytest.fixture
+def relay(redis, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "events_consumer_groups", GROUPS)
+    event_relay.ensure_consumer_groups(redis)
+
+    def publish(count: int) -> None:
+        with session_factory() as db:
+            for _ in range(count):
+                events.record_event(db, events.LOGGED_IN, None)
+            db.commit()
+            event_relay.relay_batch(db, redis, batch_size=count)
+
+    return publish
+
+
+def read(redis, group: str, count: int) -> list[dict]:
+    received: list[dict] = []
+    event_relay.consume(redis, group, "worker", received.extend, count=count, block_ms=1)
+    return received
+
+
+def crash(entries: list[dict]) -> None:
+    raise RuntimeError("consumer crashed before acknowledging")
+
+
+def test_entries_are_kept_until_every_group_has_acknowledged_them(redis, relay):
+    relay(10)
+    assert len(read(redis, "audit", 10)) == 10
+    relay(1)
+    # fraud has read nothing, so all of the stream is still there for it.
+    assert redis.xlen(settings.events_stream) == 11
+    assert [event["event_id"] for event in read(redis, "fraud", 11)] == [
+        str(event_id) for event_id in range(1, 12)
+    ]
+
+    relay(1)
+    event_relay.trim_stream(redis, approximate=False)
+    # Kept: audit's last delivered entry (10) and the two it has not read.
+    assert redis.xlen(settings.events_stream) == 3
+    assert len(read(redis, "audit", 10)) == 2
+    assert len(read(redis, "fraud", 10)) == 1
+
+
+def test_unacknowledged_entries_survive_trimming(redis, relay):
+    relay(5)
+    with pytest.raises(RuntimeError):
+        event_relay.consume(redis, "audit", "worker", crash, block_ms=1)
+    read(redis, "fraud", 5)
+    event_relay.trim_stream(redis, approximate=False)
+    assert redis.xlen(settings.events_stream) == 5
@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+from app.core.jwt_backends import BACKENDS, FastHS256Backend, b64encode
+
+SECRET = b"test-secret"
+
+
+def backend(name: str):
+    instance = BACKENDS[name]()
+    return instance, instance.prepare_key(SECRET, "HS256")
+
+
+def claims(**overrides):
+    return {"sub": "user-1", "type": "access", "exp": int(time.time()) + 600, "gen": 3, **overrides}
+
+
+def segment(value: dict) -> str:
+    return b64encode(json.dumps(value, separators=(",", ":")).encode())
+
+
+def sign(header: dict, payload: dict, key: bytes = SECRET) -> str:
+    signing_input = f"{segment(header)}.{segment(payload)}"
+    signature = hmac.new(key, signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{b64encode(signature)}"
+
+
+@pytest.mark.parametrize("name", ["jose", "pyjwt"])
+def test_fast_tokens_match_library_output(name):
+    fast, fast_key = backend("fast")
+    library, library_key = backend(name)
+    payload = claims()
+    expected = library.encode(payload, library_key, "HS256", {"kid": "k1"})
+
+    assert fast.encode(payload, fast_key, "HS256", {"kid": "k1"}) == expected
+    assert fast.decode(expected, fast_key, "HS256") == payload
+    token = fast.encode(payload, fast_key, "HS256", {})
+    assert library.decode(token, library_key, "HS256") == payload
+
+
+def test_rejects_alg_none():
+    fast, key = backend("fast")
+    unsigned = f"{segment({'alg': 'none', 'typ': 'JWT'})}.{segment(claims())}."
+    with pytest.raises(ValueError):
+        fast.decode(unsigned, key, "HS256")
+    with pytest.raises(ValueError):
+        fast.decode(sign({"alg": "none", "typ": "JWT"}, claims()), key, "HS256")
+
+
+def test_rejects_other_algorithms():
+    fast, key = backend("fast")
+    with pytest.raises(ValueError):
+        fast.decode(sign({"alg": "HS512", "typ": "JWT"}, claims()), key, "HS256")
+    with pytest.raises(ValueError):
+        FastHS256Backend().prepare_key(SECRET, "RS256")
+
+
+def test_rejects_tampering():
+    fast, key = backend("fast")
+    token = fast.encode(claims(), key, "HS256", {})
+    header, payload, signature = token.split(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+
+    for forged in (
+        f"{header}.{payload}.{flipped}",
+        f"{header}.{segment(claims(sub='admin'))}.{signature}",
+        f"{header}.{payload}.",
+        sign({"alg": "HS256", "typ": "JWT"}, claims(), key=b"other-secret"),
+        "not-a-token",
+    ):
+        with pytest.raises(ValueError):
+            fast.decode(forged, key, "HS256")
+
+
+def test_rejects_expired_and_not_yet_valid():
+    fast, key = backend("fast")
+    now = int(time.time())
+    for payload in (claims(exp=now - 1), claims(exp="never"), claims(nbf=now + 600)):
+        with pytest.raises(ValueError):
+            fast.decode(fast.encode(payload, key, "HS256", {}), key, "HS256")
@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+import pytest
+
+from app.core.config import settings
+from app.main import create_app
+
+
+@pytest.fixture
+def client():
+    return TestClient(create_app())
+
+
+def test_metrics_are_hidden_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", None)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    wrong = client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
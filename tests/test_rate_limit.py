@@ -0,0 +1,122 @@
+from fastapi import HTTPException
+import pytest
+
+from app.core.rate_limit import LocalPrefilter, RateLimit, RateLimitResult
+
+WINDOW = 60
+LOGIN_LIMIT = 5
+EMAIL_LIMIT = 10
+
+
+def make_prefilter() -> LocalPrefilter:
+    return LocalPrefilter(
+        blocked_size=100_000, width=16384, depth=4, factor=3, window_seconds=WINDOW
+    )
+
+
+class FixedWindowRedis:
+    # Stands in for the Redis script: a plain counter per key within one window.
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = {}
+        self.calls = 0
+
+    def check(self, limits: tuple[RateLimit, ...]) -> RateLimitResult:
+        self.calls += 1
+        for limit in limits:
+            if self.counts.get(limit.key, 0) >= limit.limit:
+                return RateLimitResult(limit.key, False, limit.limit, 0, WINDOW, WINDOW)
+        for limit in limits:
+            self.counts[limit.key] = self.counts.get(limit.key, 0) + 1
+        return RateLimitResult(limits[0].key, True, limits[0].limit, 0, 0, WINDOW)
+
+
+def attempt(prefilter: LocalPrefilter, redis: FixedWindowRedis, *limits: RateLimit) -> str:
+    if prefilter.check(limits) is not None:
+        return "local"
+    result = redis.check(limits)
+    if not result.allowed:
+        prefilter.block(result)
+        return "redis"
+    return "allowed"
+
+
+def login(ip: str, email: str) -> tuple[RateLimit, RateLimit]:
+    return (
+        RateLimit(f"rl:login:ip:{ip}", LOGIN_LIMIT, WINDOW),
+        RateLimit(f"rl:login:email:{email}", EMAIL_LIMIT, WINDOW),
+    )
+
+
+def test_distributed_attack_within_limits_never_sheds_legitimate_keys():
+    # 100k attacker IPs send 5 attempts each, every IP within its Redis limit.
+    prefilter, redis = make_prefilter(), FixedWindowRedis()
+    for attacker in range(100_000):
+        for guess in range(LOGIN_LIMIT):
+            outcome = attempt(prefilter, redis, *login(f"a{attacker}", f"v{attacker}-{guess}"))
+            assert outcome == "allowed"
+    assert prefilter.attempts.load() > LOGIN_LIMIT * prefilter.factor
+
+    outcomes = [attempt(prefilter, redis, *login(f"u{user}", f"u{user}")) for user in range(1000)]
+    assert outcomes.count("allowed") == 1000
+
+
+def test_hammering_key_is_shed_after_redis_denies_it():
+    prefilter, redis = make_prefilter(), FixedWindowRedis()
+    limits = (RateLimit("rl:login:ip:attacker", LOGIN_LIMIT, WINDOW),)
+    outcomes = []
+    for _ in range(100):
+        # Expire the Retry-After block so only the sketch can shed the key.
+        prefilter.blocked.clear()
+        outcomes.append(attempt(prefilter, redis, *limits))
+
+    assert outcomes[:LOGIN_LIMIT] == ["allowed"] * LOGIN_LIMIT
+    assert redis.calls == LOGIN_LIMIT * prefilter.factor + 1
+    assert outcomes[-1] == "local"
+
+
+def test_key_never_denied_by_redis_is_not_shed():
+    prefilter = make_prefilter()
+    limits = (RateLimit("rl:login:ip:busy", LOGIN_LIMIT, WINDOW),)
+    for _ in range(LOGIN_LIMIT * prefilter.factor * 4):
+        assert prefilter.check(limits) is None
+
+
+def test_saturated_sketch_falls_through_to_redis():
+    prefilter, redis = make_prefilter(), FixedWindowRedis()
+    limits = (RateLimit("rl:login:ip:attacker", LOGIN_LIMIT, WINDOW),)
+    for _ in range(50):
+        prefilter.blocked.clear()
+        attempt(prefilter, redis, *limits)
+    prefilter.blocked.clear()
+    assert prefilter.check(limits) is not None
+
+    for key in range(16384 * LOGIN_LIMIT * prefilter.factor):
+        prefilter.attempts.add(f"noise:{key}")
+    assert prefilter.check(limits) is None
+
+
+def test_locally_denied_attempts_are_not_counted():
+    prefilter, redis = make_prefilter(), FixedWindowRedis()
+    limits = (RateLimit("rl:login:ip:attacker", LOGIN_LIMIT, WINDOW),)
+    for _ in range(LOGIN_LIMIT + 1):
+        attempt(prefilter, redis, *limits)
+    counted = prefilter.attempts.estimate("rl:login:ip:attacker")
+    for _ in range(1000):
+        assert attempt(prefilter, redis, *limits) == "local"
+    assert prefilter.attempts.estimate("rl:login:ip:attacker") == counted
+
+
+def test_rate_limit_headers_survive_an_auth_error():
+    result = RateLimitResult(
+        key="rl:login:ip:1", allowed=True, limit=5, remaining=3, retry_after=0, reset_after=60
+    )
+    with pytest.raises(HTTPException) as raised:
+        with result.headers_on_errors():
+            raise HTTPException(status_code=503, headers={"Retry-After": "1"})
+
+    assert raised.value.headers == {
+        "RateLimit-Limit": "5",
+        "RateLimit-Remaining": "3",
+        "RateLimit-Reset": "60",
+        "Retry-After": "1",
+    }
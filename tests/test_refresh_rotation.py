@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from fastapi import HTTPException
+import pytest
+from sqlalchemy import select
+
+from app.core.security import decode_token, hash_password
+from app.db.models.token import RefreshToken
+from app.db.models.user import User
+from app.services import auth_service
+
+CONCURRENCY = 16
+
+
+@pytest.fixture
+def token_pair(redis, session_factory):
+    with session_factory() as db:
+        user = User(
+            email="rotate@example.com",
+            password_hash=hash_password("Password123"),
+            is_active=True,
+            is_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        return auth_service.create_token_pair(db, user)
+
+
+def rotate(session_factory, refresh_token: str) -> tuple[str, str] | int:
+    with session_factory() as db:
+        try:
+            return auth_service.refresh_tokens(db, refresh_token)
+        except HTTPException as exc:
+            return exc.status_code
+
+
+def family_tokens(session_factory) -> list[RefreshToken]:
+    with session_factory() as db:
+        return db.scalars(select(RefreshToken)).all()
+
+
+def successor_jti(result: tuple[str, str]) -> str:
+    return decode_token(result[1])["jti"]
+
+
+def test_concurrent_rotations_of_one_token_issue_one_successor(session_factory, token_pair):
+    _, refresh_token = token_pair
+    start = threading.Barrier(CONCURRENCY)
+
+    def spend(_: int):
+        start.wait()
+        return rotate(session_factory, refresh_token)
+
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        results = list(pool.map(spend, range(CONCURRENCY)))
+
+    # Every request gets the one successor; none revokes the family.
+    assert all(isinstance(result, tuple) for result in results)
+    assert len({successor_jti(result) for result in results}) == 1
+    tokens = family_tokens(session_factory)
+    assert len(tokens) == 2
+    assert len({token.family_id for token in tokens}) == 1
+    assert sum(token.revoked_at is None for token in tokens) == 1
+
+
+def test_a_retried_refresh_gets_the_same_successor(redis, session_factory, token_pair):
+    _, first = token_pair
+    second = rotate(session_factory, first)
+    retried = rotate(session_factory, first)
+
+    assert successor_jti(retried) == successor_jti(second)
+    assert sum(token.revoked_at is None for token in family_tokens(session_factory)) == 1
+    assert isinstance(rotate(session_factory, retried[1]), tuple)
+
+
+def test_reusing_a_rotated_token_revokes_the_family(redis, session_factory, token_pair):
+    _, first = token_pair
+    _, second = rotate(session_factory, first)
+    # The grace window for retries has passed.
+    redis.delete(*redis.keys(f"{auth_service.REDIS_REFRESH_SUCCESSOR_PREFIX}*"))
+
+    assert rotate(session_factory, first) == 401
+
+    assert all(token.revoked_at is not None for token in family_tokens(session_factory))
+    assert not redis.keys(f"{auth_service.REDIS_REFRESH_PREFIX}*")
+    assert rotate(session_factory, second) == 401
@@ -0,0 +1,89 @@
+from uuid import UUID
+
+from fastapi import HTTPException
+import pytest
+
+from app.api.deps import get_current_user
+from app.core.security import hash_password
+from app.db.models.user import User, UserRole
+from app.schemas.user import UserPublic
+from app.services import auth_service
+from app.services.sessions import (
+    REDIS_ROLE_GEN_PREFIX,
+    bump_role_generation,
+    bump_user_generation,
+    get_role_generation,
+)
+from app.services.user_cache import cache_user, local_users
+
+
+def test_role_bump_is_seen_without_a_local_cache(redis, session_factory):
+    with session_factory() as db:
+        assert get_role_generation(db, UserRole.user) == 0
+        assert bump_role_generation(db, UserRole.user) == 1
+        assert get_role_generation(db, UserRole.user) == 1
+        assert get_role_generation(db, UserRole.admin) == 0
+
+
+def test_role_generation_survives_a_redis_flush(redis, session_factory):
+    with session_factory() as db:
+        bump_role_generation(db, UserRole.user)
+        bump_role_generation(db, UserRole.user)
+    redis.flushall()
+
+    with session_factory() as db:
+        assert get_role_generation(db, UserRole.user) == 2
+    assert redis.get(f"{REDIS_ROLE_GEN_PREFIX}user") == "2"
+
+
+def test_bump_continues_past_a_generation_only_in_redis(redis, session_factory):
+    redis.set(f"{REDIS_ROLE_GEN_PREFIX}admin", 5)
+    with session_factory() as db:
+        assert bump_role_generation(db, UserRole.admin) == 6
+    redis.flushall()
+    with session_factory() as db:
+        assert get_role_generation(db, UserRole.admin) == 6
+
+
+@pytest.fixture
+def user_id(redis, session_factory):
+    local_users.clear()
+    with session_factory() as db:
+        user = User(
+            email="sessions@example.com",
+            password_hash=hash_password("Password123"),
+            is_active=True,
+            is_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        cache_user(user)
+        yield str(user.id)
+    local_users.clear()
+
+
+def current_user(session_factory, access_token: str) -> UserPublic | int:
+    with session_factory() as db:
+        try:
+            return get_current_user(access_token, db)
+        except HTTPException as exc:
+            return exc.status_code
+
+
+def login(session_factory, user_id: str) -> str:
+    with session_factory() as db:
+        return auth_service.create_token_pair(db, db.get(User, UUID(user_id)))[0]
+
+
+def test_bump_ends_sessions_served_from_a_stale_local_copy(session_factory, user_id):
+    old_token = login(session_factory, user_id)
+    assert current_user(session_factory, old_token).id == UUID(user_id)
+    stale = local_users.get(user_id)
+
+    with session_factory() as db:
+        bump_user_generation(db, UUID(user_id))
+    # Another worker still holds the copy cached before the bump.
+    local_users.set(user_id, stale)
+
+    assert current_user(session_factory, old_token) == 401
+    assert current_user(session_factory, login(session_factory, user_id)).id == UUID(user_id)
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import fakeredis
+
+from app.api.deps import get_current_user
+from app.core.security import hash_password
+from app.db.models.user import User, UserRole
+from app.services import auth_service, user_cache
+from app.services.sessions import bump_user_generation
+
+
+def test_delayed_invalidation_uses_one_thread(monkeypatch):
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(user_cache, "get_redis", lambda: redis)
+    invalidator = user_cache.DelayedInvalidator(delay=0.1)
+    threads = threading.active_count()
+
+    for user_id in range(1000):
+        invalidator.schedule(str(user_id))
+        # A lagging replica read re-caches the user right after the change.
+        redis.set(f"{user_cache.REDIS_USER_PREFIX}{user_id}", "stale")
+
+    assert threading.active_count() == threads + 1
+    deadline = time.monotonic() + 5
+    while redis.dbsize() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert redis.dbsize() == 0
+
+
+def test_a_stale_local_copy_is_replaced_after_a_role_change(redis, session_factory):
+    user_cache.local_users.clear()
+    with session_factory() as db:
+        user = User(
+            email="promoted@example.com",
+            password_hash=hash_password("Password123"),
+            is_active=True,
+            is_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        user_cache.cache_user(user)
+    stale = user_cache.local_users.get(str(user_id))
+
+    with session_factory() as db:
+        user = db.get(User, user_id)
+        user.role = UserRole.admin
+        bump_user_generation(db, user_id)
+        # Another worker has since cached the new copy in Redis; this one
+        # still holds the copy from before the change.
+        user_cache.cache_user(user)
+        access_token, _ = auth_service.create_token_pair(db, user)
+    user_cache.local_users.set(str(user_id), stale)
+
+    with session_factory() as db:
+        assert get_current_user(access_token, db).role == UserRole.admin
+    user_cache.local_users.clear()